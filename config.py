@@ -2,3 +2,10 @@
 
 SCALE = 2
 RESOLUTION = (640 * SCALE, 400 * SCALE)
+FPS = 60
+# While nothing is animating the game waits for input, for up to this many milliseconds.
+IDLE_TIMEOUT = 500
+# Browsers can't wait for input, so the game runs at this rate instead.
+IDLE_FPS = 10
+# Finished games are saved here, to be watched with tiny_space/replay.py.
+REPLAY_DIR = "replays"
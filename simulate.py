@@ -0,0 +1,121 @@
+#!python
+"""Play many games headlessly across every CPU core.
+
+Each game's results are streamed to a JSONL or CSV file (chosen by the output file's extension), then the
+throughput and average score are logged. For example:
+
+    ./simulate.py --games 10000 --policy greedy --output results.jsonl
+
+Replays saved with --replays can be checked or watched with tiny_space/replay.py.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields
+from functools import partial
+from pathlib import Path
+from typing import Any, Iterator
+
+from tiny_space.engine import GameState  # noqa: I900
+from tiny_space.helpers import GridPoint  # noqa: I900
+from tiny_space.policies import POLICIES, get_policy  # noqa: I900
+from tiny_space.resources import ResourceQueue  # noqa: I900
+from tiny_space.score import Score  # noqa: I900
+
+
+def play_game(
+    seed: int, policy_name: str, grid_size: GridPoint, max_turns: int, replays: Path | None = None
+) -> dict[str, Any]:
+    """Play a whole game, returning its results. If replays is a directory, save a replay of the game there."""
+    policy = get_policy(policy_name)
+    rng = random.Random(seed)
+    state = GameState(grid_size, queue=ResourceQueue(str(seed)))
+    log = state.start_recording() if replays else None
+    moves = 0
+    while state.turn < max_turns and not state.is_over:
+        move = policy(state, rng)
+        if not state.apply(move):
+            raise ValueError(f"Policy {policy_name!r} made an illegal move: {move}")
+        moves += 1
+    if replays is not None and log:
+        (replays / f"{seed}.tsr").write_bytes(log.finish(state))
+    return {
+        "seed": seed,
+        **asdict(state.score),
+        "turns": state.turn,
+        "moves": moves,
+        "buildings_built": state.buildings_built,
+    }
+
+
+def write_results(results: Iterator[dict[str, Any]], output: Path) -> tuple[int, dict[str, int]]:
+    """Write each result as it arrives, returning how many were written and the total of each score."""
+    count = 0
+    totals = dict.fromkeys((f.name for f in fields(Score)), 0)
+    with output.open("w", newline="") as file:
+        if output.suffix == ".csv":
+            columns = ["seed", *(f.name for f in fields(Score)), "turns", "moves", "buildings_built"]
+            writer = csv.DictWriter(file, fieldnames=columns)
+            writer.writeheader()
+            for result in results:
+                writer.writerow(result)
+                count += 1
+                for name in totals:
+                    totals[name] += result[name]
+        else:
+            for result in results:
+                file.write(json.dumps(result) + "\n")
+                count += 1
+                for name in totals:
+                    totals[name] += result[name]
+    return count, totals
+
+
+def parse_grid_size(text: str) -> GridPoint:
+    width, _, height = text.lower().partition("x")
+    return GridPoint(int(width), int(height))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", type=int, default=1000, help="Number of games to play.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game, each game adds one.")
+    parser.add_argument("--policy", default="random", help=f"One of {list(POLICIES)}, or module:function.")
+    parser.add_argument("--grid-size", type=parse_grid_size, default=GameState.default_grid_size, help="WxH")
+    parser.add_argument("--max-turns", type=int, default=10_000, help="Stop games after this many resources.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of processes, defaults to CPU count.")
+    parser.add_argument("--replays", type=Path, default=None, help="Save a replay of every game in this directory.")
+    parser.add_argument("--output", type=Path, default=Path("results.jsonl"), help="A .jsonl or .csv file.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    # Fail before starting the workers if the policy doesn't exist.
+    get_policy(args.policy)
+    if args.replays:
+        args.replays.mkdir(parents=True, exist_ok=True)
+
+    play = partial(
+        play_game, policy_name=args.policy, grid_size=args.grid_size, max_turns=args.max_turns, replays=args.replays
+    )
+    seeds = range(args.seed, args.seed + args.games)
+    start = time.perf_counter()
+    workers = args.workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Big enough chunks to keep the workers busy, small enough that results stream in.
+        chunksize = max(1, args.games // (4 * workers))
+        count, totals = write_results(executor.map(play, seeds, chunksize=chunksize), args.output)
+    elapsed = time.perf_counter() - start
+    logging.info(f"Played {count} games in {elapsed:.2f}s ({count / elapsed:.0f} games/s), results in {args.output}")
+    if count:
+        averages = ", ".join(f"{name} {total / count:.2f}" for name, total in totals.items())
+        logging.info(f"Average score: {averages}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from tiny_space.buildings import Building
+from tiny_space.engine import GameState
+from tiny_space.grid import Grid
+from tiny_space.helpers import GridPoint
+from tiny_space.resources import Aerofoam, Crystal, Iron, Oil
+from tiny_space.thing import TILE_REGISTRY, Nothing, Tile
+
+TILES: list[Tile] = [Nothing, Iron, Oil, Crystal, Aerofoam]
+
+
+@pytest.fixture(autouse=True)
+def restore_registries():
+    """Forget the buildings a test defines, so they aren't built in later tests."""
+    buildings = list(Building.BUILDING_REGISTRY)
+    tiles = list(TILE_REGISTRY)
+    yield
+    Building.BUILDING_REGISTRY[:] = buildings
+    TILE_REGISTRY[:] = tiles
+
+
+def random_grid(seed: int, size: GridPoint = GameState.default_grid_size) -> Grid:
+    """Make a grid of random resources and empty tiles."""
+    rng = random.Random(seed)
+    grid = Grid.from_dimensions(size)
+    for point in [GridPoint(x, y) for y in range(size.y) for x in range(size.x)]:
+        grid[point] = rng.choice(TILES)
+    return grid
+
+
+def validate_schematic(schematic: Grid, subgrid: Grid) -> bool:
+    """Check a schematic against a subgrid of the same size the slow way, one tile at a time."""
+    return not any(
+        schematic_tile is not Nothing and schematic_tile != grid_tile
+        for (_, schematic_tile), (_, grid_tile) in zip(schematic, subgrid, strict=True)
+    )
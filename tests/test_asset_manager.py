@@ -0,0 +1,31 @@
+import pygame as pg
+
+from tiny_space.asset_manager import AssetManager
+from tiny_space.resources import Iron
+from tiny_space.thing import Thing
+
+
+def test_images_are_loaded_and_scaled_once():
+    assets = AssetManager()
+    path = Iron.get_sprite_file()
+    image = assets.image(path)
+    assert assets.image(path) is image
+    scaled = assets.image(path, 2)
+    assert scaled.get_size() == (image.get_width() * 2, image.get_height() * 2)
+    assert assets.image(str(path), 2) is scaled
+
+
+def test_text_is_rendered_once_and_evicted_when_unused():
+    pg.font.init()
+    assets = AssetManager()
+    assets.max_texts = 2
+    font_file = Thing.root_asset_dir / "Orbitron-Regular.ttf"
+    build = assets.text("Build", font_file, 18, "black")
+    assert assets.text("Build", font_file, 18, (0, 0, 0)) is build
+    assert assets.font(font_file, 18) is assets.font(str(font_file), 18)
+    assets.text("One", font_file, 18, "black")
+    assets.text("Build", font_file, 18, "black")
+    assets.text("Two", font_file, 18, "black")
+    # "One" was the least recently used.
+    assert assets.text("Build", font_file, 18, "black") is build
+    assert len(assets._texts) == 2
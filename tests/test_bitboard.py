@@ -0,0 +1,45 @@
+import pytest
+from conftest import random_grid, validate_schematic
+
+from tiny_space.bitboard import Bitboard
+from tiny_space.helpers import ORTHOGONAL, GridPoint
+from tiny_space.matching import buildable_buildings
+from tiny_space.resources import Iron, Oil
+from tiny_space.thing import Nothing
+
+
+def test_set_and_get():
+    bitboard = Bitboard(GridPoint(3, 2))
+    bitboard.set(GridPoint(2, 1), Iron)
+    assert bitboard[GridPoint(2, 1)] is Iron
+    assert bitboard.occupied == 1 << 5
+    bitboard.set(GridPoint(2, 1), Oil)
+    assert bitboard.masks[Iron.code] == 0
+    assert bitboard.masks[Oil.code] == 1 << 5
+    bitboard.set(GridPoint(2, 1), Nothing)
+    assert bitboard.occupied == 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_has_adjacent(seed):
+    grid = random_grid(seed)
+    bitboard = Bitboard.from_grid(grid)
+    for point, _tile in grid:
+        neighbours = [point + direction for direction in ORTHOGONAL]
+        expected = any(grid.is_in_grid(n) and grid[n] is not Nothing for n in neighbours)
+        assert bitboard.has_adjacent(point) == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_match_agrees_with_validate_schematic(seed):
+    grid = random_grid(seed)
+    bitboard = Bitboard.from_grid(grid)
+    for building in buildable_buildings():
+        for rotation_index in range(4):
+            rotation = building.get_rotation(rotation_index)
+            matched = set(bitboard.points(bitboard.match(rotation)))
+            for point, _tile in grid:
+                expected = grid.is_in_grid(point + rotation.size - GridPoint(1, 1)) and validate_schematic(
+                    rotation.grid, grid.get_subgrid(*point, *rotation.size)[0]
+                )
+                assert (point in matched) == expected
@@ -0,0 +1,124 @@
+import random
+import subprocess
+import sys
+from dataclasses import astuple
+
+from tiny_space import buildings
+from tiny_space.engine import Build, GameState, PlaceResource
+from tiny_space.helpers import ORTHOGONAL, GridPoint
+from tiny_space.matching import Placement, find_placements
+from tiny_space.policies import greedy_policy
+from tiny_space.resources import Oil, ResourceQueue
+from tiny_space.thing import Nothing
+
+
+class FixedQueue(ResourceQueue):
+    """A queue that only ever gives out Oil."""
+
+    def new_bag(self):
+        return [Oil] * 5
+
+
+def test_engine_does_not_import_pygame():
+    code = "import sys, tiny_space.engine; assert 'pygame' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_place_resource():
+    state = GameState(queue=FixedQueue())
+    centre = state.grid.size // 2
+    assert state.grid[centre] is buildings.Base
+
+    assert not state.place_resource(GridPoint(0, 0))
+    assert state.place_resource(centre + GridPoint(1, 0))
+    assert state.grid[centre + GridPoint(1, 0)] is Oil
+    assert state.turn == 1
+
+
+def test_build():
+    state = GameState(queue=FixedQueue())
+    point = state.grid.size // 2 + GridPoint(1, 0)
+    state.place_resource(point)
+    placement = Placement(buildings.Amet, 0, point)
+    assert placement in state.placements
+    assert Build(placement, point) in state.legal_moves()
+
+    assert not state.build(placement, point + GridPoint(1, 0))
+    assert state.build(placement, point)
+    assert state.grid[point] is buildings.Amet
+    assert state.buildings_built == 1
+    assert placement not in state.placements
+
+
+def test_games_are_independent():
+    first, second = GameState(queue=FixedQueue()), GameState(queue=FixedQueue())
+    point = first.grid.size // 2 + GridPoint(0, 1)
+    assert first.apply(PlaceResource(point))
+    assert second.grid[point] is Nothing
+    assert PlaceResource(point) in second.legal_moves()
+    assert PlaceResource(point) not in first.legal_moves()
+
+
+def test_frontier_matches_adjacent_empty_tiles():
+    state = GameState(queue=FixedQueue())
+    rng = random.Random(0)
+    for _ in range(60):
+        moves = state.legal_moves()
+        if not moves:
+            break
+        state.apply(rng.choice(moves))
+        expected = {
+            point
+            for point, tile in state.grid
+            if tile is Nothing
+            and any(state.grid.is_in_grid(point + d) and state.grid[point + d] is not Nothing for d in ORTHOGONAL)
+        }
+        assert state.legal_resource_moves() == expected
+
+
+def test_game_over_when_no_moves_left():
+    state = GameState(GridPoint(1, 2), queue=FixedQueue())
+    assert not state.is_over
+    # The only free tile gets Oil, which can always be built into Amet.
+    assert state.place_resource(GridPoint(0, 0))
+    assert state.is_full()
+    assert not state.is_over
+    assert state.build(Placement(buildings.Amet, 0, GridPoint(0, 0)), GridPoint(0, 0))
+    assert state.is_over
+
+
+def test_undo_redo_restores_everything():
+    state = GameState(queue=ResourceQueue("undo"))
+    rng = random.Random(0)
+    snapshots = []
+    while not state.is_over:
+        snapshots.append(
+            (state.grid.to_bytes(), astuple(state.score), state.queue.peek_n(3), state.turn, set(state.frontier))
+        )
+        assert state.apply(greedy_policy(state, rng))
+    moves = [entry.move for entry in state.history]
+    assert any(isinstance(move, Build) for move in moves)
+    final = state.grid.to_bytes(), astuple(state.score), state.calculate_score()
+
+    for snapshot in reversed(snapshots):
+        assert state.undo()
+        assert (state.grid.to_bytes(), astuple(state.score), state.queue.peek_n(3), state.turn, state.frontier) == (
+            snapshot
+        )
+        assert set(state.placements) == set(find_placements(state.grid))
+    assert state.undo() is None
+
+    for move in moves:
+        assert state.redo() == move
+    assert state.redo() is None
+    assert (state.grid.to_bytes(), astuple(state.score), state.calculate_score()) == final
+
+
+def test_new_move_clears_redo():
+    state = GameState(queue=ResourceQueue("undo"))
+    move = next(iter(state.legal_resource_moves()))
+    state.place_resource(move)
+    state.undo()
+    assert state.future
+    state.place_resource(move)
+    assert not state.future
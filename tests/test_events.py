@@ -0,0 +1,49 @@
+import gc
+
+from tiny_space.helpers import Event, EventBus
+
+
+class Listener:
+    def __init__(self, bus: EventBus, *topics: Event):
+        self.received: list[Event] = []
+        for topic in topics:
+            bus.subscribe(topic, self.listen)
+
+    def listen(self, event: Event):
+        self.received.append(event)
+
+
+def test_events_only_go_to_their_subscribers():
+    bus = EventBus()
+    resources = Listener(bus, Event.PlaceResource)
+    both = Listener(bus, Event.PlaceResource, Event.GameOver)
+    bus.publish(Event.GameOver)
+    bus.publish(Event.PlaceResource)
+    assert resources.received == [Event.PlaceResource]
+    assert both.received == [Event.GameOver, Event.PlaceResource]
+    bus.unsubscribe(Event.GameOver, both.listen)
+    bus.publish(Event.GameOver)
+    assert both.received == [Event.GameOver, Event.PlaceResource]
+
+
+def test_subscribers_are_weakly_referenced():
+    bus = EventBus()
+    for _ in range(100):
+        Listener(bus, Event.PlaceResource)
+    gc.collect()
+    kept = Listener(bus, Event.PlaceResource)
+    bus.publish(Event.PlaceResource)
+    assert kept.received == [Event.PlaceResource]
+    assert len(bus._subscribers[Event.PlaceResource]) == 1
+
+
+def test_posted_events_wait_for_flush():
+    bus = EventBus()
+    listener = Listener(bus, Event.PlaceResource, Event.PlaceBuilding)
+    bus.post(Event.PlaceResource)
+    bus.post(Event.PlaceBuilding)
+    assert listener.received == []
+    bus.flush()
+    assert listener.received == [Event.PlaceResource, Event.PlaceBuilding]
+    bus.flush()
+    assert len(listener.received) == 2
@@ -0,0 +1,86 @@
+import pytest
+
+from tiny_space.grid import Grid
+from tiny_space.helpers import GridPoint
+from tiny_space.resources import Aerofoam, Crystal, Iron, Oil
+from tiny_space.thing import TILE_REGISTRY, Nothing
+
+
+def test_nothing_is_code_zero():
+    assert Nothing.code == 0
+    assert TILE_REGISTRY[Iron.code] is Iron
+
+
+def test_indexing():
+    grid = Grid([[Iron, Oil, Crystal], [Aerofoam, Nothing, Iron]])
+    assert grid.size == GridPoint(2, 3)
+    assert grid[1, 0] is Aerofoam
+    assert grid[GridPoint(0, 2)] is Crystal
+    assert grid[1] == [Aerofoam, Nothing, Iron]
+
+    grid[GridPoint(1, 1)] = Oil
+    assert grid[1, 1] is Oil
+    with pytest.raises(IndexError):
+        grid[2, 0]
+
+
+def test_iteration_order():
+    grid = Grid([[Iron, Oil], [Crystal, Aerofoam]])
+    assert list(grid) == [
+        (GridPoint(0, 0), Iron),
+        (GridPoint(1, 0), Crystal),
+        (GridPoint(0, 1), Oil),
+        (GridPoint(1, 1), Aerofoam),
+    ]
+
+
+def test_from_dimensions():
+    grid = Grid.from_dimensions(GridPoint(3, 2))
+    assert grid.size == GridPoint(3, 2)
+    assert all(tile is Nothing for _, tile in grid)
+
+
+def test_rotate_non_square():
+    grid = Grid([[Iron, Oil, Crystal], [Aerofoam, Nothing, Iron]])
+    rotated = grid.rotate(1)
+    assert rotated == Grid([[Aerofoam, Iron], [Nothing, Oil], [Iron, Crystal]])
+    assert grid.rotate(4) == grid
+    assert rotated.rotate(3) == grid
+
+
+def test_get_subgrid():
+    grid = Grid([[Iron, Oil, Crystal], [Aerofoam, Nothing, Iron]])
+    subgrid, offset = grid.get_subgrid(1, 1, 1, 2)
+    assert offset == GridPoint(1, 1)
+    assert subgrid == Grid([[Nothing, Iron]])
+
+    subgrid, _offset = grid.get_subgrid(0, 1, 2, 2)
+    assert subgrid[1, 0] is Nothing
+    assert subgrid[0] == [Oil, Crystal]
+    assert subgrid == Grid([[Oil, Crystal], [Nothing, Iron]])
+    # The subgrid is a copy.
+    grid[GridPoint(1, 1)] = Oil
+    assert subgrid[1, 0] is Nothing
+    with pytest.raises(IndexError):
+        subgrid[0, 2]
+
+
+def test_hash_is_maintained_on_assignment():
+    grid = Grid.from_dimensions(GridPoint(3, 3))
+    empty_hash = hash(grid)
+    assert grid.zobrist == 0
+
+    grid[GridPoint(1, 2)] = Iron
+    assert grid == Grid([[Nothing, Nothing, Nothing], [Nothing, Nothing, Iron], [Nothing, Nothing, Nothing]])
+    assert hash(grid) == hash(Grid([[Nothing, Nothing, Nothing], [Nothing, Nothing, Iron], [Nothing] * 3]))
+
+    grid[GridPoint(1, 2)] = Nothing
+    assert hash(grid) == empty_hash
+
+
+def test_grids_as_dict_keys():
+    grid = Grid([[Iron, Oil], [Crystal, Aerofoam]])
+    seen = {grid.copy(): "seen"}
+    assert seen[grid.rotate(4)] == "seen"
+    assert grid.rotate(1) not in seen
+    assert Grid([[Iron, Oil]]) != Grid([[Iron], [Oil]])
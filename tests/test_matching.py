@@ -0,0 +1,86 @@
+import random
+
+import pytest
+from conftest import TILES, random_grid, validate_schematic
+
+from tiny_space.bitboard import Bitboard
+from tiny_space.buildings import Building
+from tiny_space.grid import Grid
+from tiny_space.helpers import GridPoint
+from tiny_space.matching import (
+    Placement,
+    PlacementIndex,
+    SchematicLibrary,
+    buildable_buildings,
+    find_placements,
+)
+from tiny_space.resources import Iron, Oil
+from tiny_space.thing import Nothing
+
+
+def brute_force_placements(grid: Grid) -> list[Placement]:
+    placements = []
+    for building in buildable_buildings():
+        for rotation in range(4):
+            schematic = building.get_schematic(rotation)
+            for y in range(grid.height - schematic.height + 1):
+                for x in range(grid.width - schematic.width + 1):
+                    subgrid, offset = grid.get_subgrid(x, y, schematic.width, schematic.height)
+                    if validate_schematic(schematic, subgrid):
+                        placements.append(Placement(building, rotation, offset))
+    return placements
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_find_placements_matches_brute_force(seed):
+    grid = random_grid(seed)
+    assert sorted(find_placements(grid), key=repr) == sorted(brute_force_placements(grid), key=repr)
+
+
+def test_find_placements_schematic_wildcards():
+    class TestWildcardBuilding(Building):
+        _schematic = Grid([[Iron, Nothing]])
+
+    grid = Grid([[Iron, Oil], [Oil, Iron]])
+    assert find_placements(grid, [TestWildcardBuilding]) == [
+        Placement(TestWildcardBuilding, 0, GridPoint(0, 0)),
+        Placement(TestWildcardBuilding, 1, GridPoint(0, 0)),
+        Placement(TestWildcardBuilding, 2, GridPoint(1, 0)),
+        Placement(TestWildcardBuilding, 3, GridPoint(0, 1)),
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_placement_index_tracks_changes(seed):
+    rng = random.Random(seed)
+    grid = random_grid(seed)
+    bitboard = Bitboard.from_grid(grid)
+    index = PlacementIndex(bitboard)
+    assert index.placements == set(find_placements(grid))
+    for _ in range(50):
+        point = GridPoint(rng.randrange(grid.width), rng.randrange(grid.height))
+        grid[point] = rng.choice(TILES)
+        bitboard.set(point, grid[point])
+        index.update(point)
+        assert index.placements == set(find_placements(grid))
+
+
+def test_schematic_library_shares_identical_shapes():
+    class TestSquareBuilding(Building):
+        _schematic = Grid([[Oil, Oil], [Oil, Oil]])
+
+    class TestSameSquareBuilding(Building):
+        _schematic = Grid([[Oil, Oil], [Oil, Oil]])
+
+    class TestBarBuilding(Building):
+        _schematic = Grid([[Iron, Oil]])
+
+    library = SchematicLibrary([TestSquareBuilding, TestSameSquareBuilding, TestBarBuilding])
+    # The square is the same at every rotation, the bar has four distinct rotations.
+    assert len(library) == 5
+    assert library.uses[0] == tuple(
+        (building, r) for building in (TestSquareBuilding, TestSameSquareBuilding) for r in range(4)
+    )
+    grid = Grid([[Oil, Oil, Iron], [Oil, Oil, Oil]])
+    placements = find_placements(grid, [TestSquareBuilding, TestSameSquareBuilding, TestBarBuilding])
+    assert len(placements) == 8 + 2
@@ -0,0 +1,24 @@
+import random
+
+import pytest
+
+from tiny_space.engine import GameState
+from tiny_space.policies import POLICIES, get_policy, greedy_policy
+from tiny_space.resources import ResourceQueue
+
+
+@pytest.mark.parametrize("name", POLICIES)
+def test_policies_play_legal_moves(name):
+    policy = get_policy(name)
+    state = GameState(queue=ResourceQueue("test"))
+    rng = random.Random(0)
+    while state.turn < 100 and not state.is_over:
+        assert state.apply(policy(state, rng))
+    assert state.is_over
+    assert not state.legal_moves()
+
+
+def test_get_policy_by_import_path():
+    assert get_policy("tiny_space.policies:greedy_policy") is greedy_policy
+    with pytest.raises(ValueError):
+        get_policy("not a policy")
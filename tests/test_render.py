@@ -0,0 +1,57 @@
+import pygame as pg
+from conftest import random_grid
+
+from tiny_space import resources
+from tiny_space.engine import GameState
+from tiny_space.helpers import GridPoint, Point, events
+from tiny_space.sidebar import ResourceQueueUI
+from tiny_space.world import World, WorldGraphicsComponent
+
+
+def test_world_render_state_changes_with_what_is_drawn():
+    pg.init()
+    world = World(Point(640, 640), state=GameState())
+    mouse = Point(1, 1)
+    state = world.render_state(mouse)
+    world.render(mouse)
+    assert world.render_state(mouse) == state
+    # Moving within the same tile draws the same thing.
+    assert world.render_state(mouse + Point(1, 1)) == state
+
+    assert world.render_state(Point(-1, -1)) != state
+    tile = next(iter(world.state.frontier))
+    assert world.state.place_resource(GridPoint(*tile))
+    assert world.render_state(mouse) != state
+
+
+def test_board_layer_is_redrawn_where_the_grid_changed():
+    pg.init()
+    grid = random_grid(1)
+    graphics = WorldGraphicsComponent(40, grid.size)
+    graphics.render(grid)
+    for seed in range(2, 6):
+        other = random_grid(seed)
+        for point, tile in list(other)[: seed * 3]:
+            grid[point] = tile
+        # Drawn from scratch by a new component.
+        expected = WorldGraphicsComponent(40, grid.size).render(grid)
+        assert pg.image.tobytes(graphics.render(grid), "RGB") == pg.image.tobytes(expected, "RGB")
+
+
+def test_undo_stops_the_queue_sliding():
+    pg.init()
+    world = World(Point(640, 640))
+    queue_ui = ResourceQueueUI(Point(300, 100))
+    front = resources.Queue.peek_n(1)[0]
+    tile = next(iter(world.state.frontier))
+    world.process_inputs(world.graphics.grid_to_pixels(GridPoint(*tile)))
+    events.flush()
+    assert queue_ui.is_animating()
+    queue_ui.render()
+
+    world.undo()
+    events.flush()
+    assert resources.Queue.last_resource_taken is None
+    assert not queue_ui.is_animating()
+    queue_ui.render()
+    assert resources.Queue.peek_n(1)[0] is front
@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from tiny_space.engine import GameState
+from tiny_space.policies import greedy_policy
+from tiny_space.replay import ReplayError, ReplayReader, replay, unzigzag, zigzag
+from tiny_space.resources import ResourceQueue
+
+
+def play_recorded_game(seed) -> tuple[GameState, bytes]:
+    state = GameState(queue=ResourceQueue(seed))
+    log = state.start_recording()
+    rng = random.Random(0)
+    while not state.is_over:
+        assert state.apply(greedy_policy(state, rng))
+    return state, log.finish(state)
+
+
+@pytest.mark.parametrize("seed", ["test", 12345, -7])
+def test_replay_reproduces_game(seed):
+    state, data = play_recorded_game(seed)
+    assert state.buildings_built
+    replayed = replay(data)
+    assert replayed.score == state.score
+    assert replayed.turn == state.turn
+    assert replayed.grid == state.grid
+
+
+def test_replay_skips_resources_already_taken():
+    queue = ResourceQueue("test")
+    queue.take_n(3)
+    state = GameState(queue=queue)
+    log = state.start_recording()
+    for _ in range(5):
+        state.apply(greedy_policy(state, random.Random(0)))
+    assert replay(log.finish(state)).grid == state.grid
+
+
+def test_replay_is_compact():
+    state, data = play_recorded_game("test")
+    # Each move is a few bytes, plus building names the first time they appear.
+    assert len(data) < 8 * (state.turn + state.buildings_built) + 64
+
+
+def test_replay_detects_tampering():
+    _state, data = play_recorded_game("test")
+    with pytest.raises(ReplayError):
+        replay(data[:-1] + bytes([data[-1] ^ 1]))
+    with pytest.raises(ReplayError):
+        replay(b"nope" + data[4:])
+    moves = list(ReplayReader(data))
+    assert len(moves) > 1
+
+
+def test_zigzag():
+    for value in (0, 1, -1, 2, -2, 1000, -1000):
+        assert zigzag(value) >= 0
+        assert unzigzag(zigzag(value)) == value
+
+
+def test_undo_removes_moves_from_replay():
+    state = GameState(queue=ResourceQueue("test"))
+    log = state.start_recording()
+    rng = random.Random(1)
+    moves = 0
+    while not state.is_over:
+        assert state.apply(greedy_policy(state, rng))
+        moves += 1
+        if moves % 3 == 0:
+            state.undo()
+    assert replay(log.finish(state)).grid == state.grid
+
+
+def test_recording_must_start_before_moves():
+    state = GameState(queue=ResourceQueue("test"))
+    state.place_resource(next(iter(state.legal_resource_moves())))
+    with pytest.raises(ValueError):
+        state.start_recording()
+
+
+def test_undo_after_finishing_removes_result():
+    state, _data = play_recorded_game("test")
+    assert state.log
+    state.undo()
+    assert replay(state.log.finish(state)).turn == state.turn
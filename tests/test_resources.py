@@ -0,0 +1,39 @@
+import random
+
+from tiny_space.resources import ResourceQueue
+
+
+def test_same_seed_same_queue():
+    first = ResourceQueue("seed")
+    random.seed(1234)
+    random.random()
+    second = ResourceQueue("seed")
+    assert first.take_n(50) == second.take_n(50)
+
+
+def test_queue_does_not_touch_global_random():
+    random.seed(1234)
+    expected = random.random()
+    random.seed(1234)
+    ResourceQueue("seed").take_n(50)
+    assert random.random() == expected
+
+
+def test_getstate_and_setstate():
+    queue = ResourceQueue(7)
+    queue.take_n(3)
+    state = queue.getstate()
+    taken = queue.take_n(40)
+    queue.setstate(state)
+    assert queue.take_n(40) == taken
+    assert queue.last_resource_taken == taken[-1]
+
+
+def test_lookahead():
+    queue = ResourceQueue("seed")
+    queue.take_n(3)
+    ahead = queue.lookahead()
+    upcoming = [next(ahead) for _ in range(100)]
+    assert queue.peek_at(99) == upcoming[99]
+    assert queue.peek_n(100) == upcoming
+    assert queue.take_n(100) == upcoming
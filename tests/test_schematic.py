@@ -1,8 +1,10 @@
 import pytest
 
+from tiny_space import buildings
 from tiny_space.buildings import Building
 from tiny_space.grid import Grid
-from tiny_space.resources import Iron
+from tiny_space.helpers import GridPoint
+from tiny_space.resources import Iron, Oil, Resource
 from tiny_space.thing import Nothing
 
 # Assuming Grid has a method to compare equality that is meaningful for tests
@@ -46,3 +48,126 @@ def test_get_schematic(rotation, expected_id):
     assert (
         result == rotations[rotation % 4]
     ), f"Failed for {expected_id}. Expected {rotations[rotation % 4]}. Got {result}"
+
+
+def test_rotations_are_shared_and_frozen():
+    class TestFrozenBuilding(Building):
+        _schematic = Grid([[Iron, Iron], [Iron, Nothing]])
+
+    assert TestFrozenBuilding.get_schematic(1) is TestFrozenBuilding.get_schematic(1)
+    with pytest.raises(TypeError):
+        TestFrozenBuilding.get_schematic(0)[GridPoint(0, 0)] = Nothing
+
+    rotation = TestFrozenBuilding.get_rotation(1)
+    assert rotation.size == GridPoint(2, 2)
+    assert rotation.occupied == ((GridPoint(0, 0), Iron), (GridPoint(0, 1), Iron), (GridPoint(1, 1), Iron))
+
+
+BUILDINGS_TOML = """
+[TestDataBuilding]
+description = "From a data file"
+schematic = [["Iron", "Oil"], ["Nothing", "Iron"]]
+score = [1, 0, 0, 0]
+adjacency = [{ neighbour = "Resource", score = [0, 1, 0, 0] }]
+
+[TestSharedBuilding]
+schematic = "TestDataBuilding"
+"""
+
+
+def test_building_definitions_are_cached(tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    monkeypatch.setenv("TINY_SPACE_CACHE_DIR", str(cache))
+    path = tmp_path / "buildings.toml"
+    path.write_text(BUILDINGS_TOML)
+    definitions = buildings.load_definitions(path)
+    assert [definition.name for definition in definitions] == ["TestDataBuilding", "TestSharedBuilding"]
+    assert definitions[0].rotations == definitions[1].rotations
+    assert len(list(cache.iterdir())) == 1
+    assert buildings.load_definitions(path) == definitions
+
+    # Changing the file invalidates the cache.
+    path.write_text(BUILDINGS_TOML.replace("[1, 0, 0, 0]", "[2, 0, 0, 0]"))
+    assert buildings.load_definitions(path)[0].score == [2, 0, 0, 0]
+
+    # A corrupt cache is recompiled.
+    for file in cache.iterdir():
+        file.write_text("{")
+    assert buildings.load_definitions(path)[0].score == [2, 0, 0, 0]
+
+
+def test_building_definitions_are_only_cached_when_asked(tmp_path, monkeypatch):
+    monkeypatch.delenv("TINY_SPACE_CACHE_DIR", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setenv("HOME", str(tmp_path))
+    path = tmp_path / "buildings.toml"
+    path.write_text(BUILDINGS_TOML)
+    assert buildings.load_definitions(path) == buildings.compile_buildings(BUILDINGS_TOML)
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_define_building_from_data():
+    building = buildings.define_buildings(buildings.compile_buildings(BUILDINGS_TOML))["TestDataBuilding"]
+    assert building.description == "From a data file"
+    assert building.adjacency_rules == (buildings.AdjacencyRule(Resource, (0, 1, 0, 0)),)
+    assert building.get_schematic() == buildings.grid_from_transposed([[Iron, Oil], [Nothing, Iron]])
+    for rotation in range(4):
+        assert building.get_schematic(rotation) == building.get_schematic().rotate(rotation)
+
+
+def test_unknown_resources_are_rejected():
+    with pytest.raises(ValueError, match="TestBadBuilding's schematic has unknown resource 'Unobtainium'"):
+        buildings.compile_buildings('[TestBadBuilding]\nschematic = [["Iron", "Unobtainium"]]')
+
+
+def test_unknown_neighbours_are_rejected():
+    toml = '[TestBadBuilding]\nschematic = [["Iron"]]\nadjacency = [{ neighbour = "Facility", score = [1, 0, 0, 0] }]'
+    with pytest.raises(ValueError, match="TestBadBuilding's adjacency has unknown neighbour 'Facility'"):
+        buildings.compile_buildings(toml)
+
+
+def test_neighbours_can_be_defined_later_in_the_file():
+    toml = """
+[TestFirstBuilding]
+schematic = [["Iron"]]
+adjacency = [{ neighbour = "TestSecondBuilding", score = [1, 0, 0, 0] }]
+
+[TestSecondBuilding]
+schematic = [["Oil"]]
+adjacency = [{ neighbour = "TestSecondBuilding", score = [0, 1, 0, 0] }]
+"""
+    defined = buildings.define_buildings(buildings.compile_buildings(toml))
+    first, second = defined["TestFirstBuilding"], defined["TestSecondBuilding"]
+    assert first.adjacency_rules == (buildings.AdjacencyRule(second, (1, 0, 0, 0)),)
+    assert second.adjacency_rules == (buildings.AdjacencyRule(second, (0, 1, 0, 0)),)
+
+
+def test_schematic_references_can_be_chained():
+    toml = '[TestX2]\nschematic = "TestX3"\n[TestX3]\nschematic = "TestX1"\n[TestX1]\nschematic = [["Iron", "Oil"]]'
+    definitions = buildings.compile_buildings(toml)
+    assert definitions[0].rotations == definitions[1].rotations == definitions[2].rotations
+
+
+@pytest.mark.parametrize(
+    "toml, message",
+    [
+        ('[TestBadBuilding]\nschematic = "TestMissing"', "TestBadBuilding's schematic refers to unknown building"),
+        ('[TestBadBuilding]\nschematic = "TestOther"\n[TestOther]\nschematic = "TestBadBuilding"', "refers back"),
+        ("[TestBadBuilding]\nscore = [1, 0, 0, 0]", "TestBadBuilding has no schematic"),
+    ],
+)
+def test_bad_schematic_references_are_rejected(toml, message):
+    with pytest.raises(ValueError, match=message):
+        buildings.compile_buildings(toml)
+
+
+def test_data_buildings_can_be_imported():
+    from tiny_space.buildings import WardenOutpost
+
+    assert WardenOutpost is buildings.BUILDINGS["WardenOutpost"]
+    assert WardenOutpost in Building.BUILDING_REGISTRY
+
+
+def test_buildings_defined_by_tests_are_forgotten():
+    # TestBuilding and friends were defined by earlier tests.
+    assert not any(repr(building).startswith("Test") for building in Building.BUILDING_REGISTRY)
@@ -0,0 +1,39 @@
+import random
+
+import pytest
+from conftest import random_grid
+
+from tiny_space.buildings import Base, Building, CommsTower, WardenOutpost
+from tiny_space.grid import Grid
+from tiny_space.helpers import GridPoint
+from tiny_space.resources import Iron, Oil
+from tiny_space.score import Score
+from tiny_space.scoring import ScoreTracker
+from tiny_space.thing import Nothing, Tile
+
+
+class ScoringTestBuilding(Building):
+    score = [1, 2, 3, 4]
+
+
+def test_warden_outpost_scores_adjacent_buildings():
+    grid = Grid([[WardenOutpost, CommsTower], [Base, Iron]])
+    score = Score()
+    ScoreTracker(grid, score)
+    assert score == Score(4, 0, 0, 0)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_score_matches_full_recalculation(seed):
+    rng = random.Random(seed)
+    grid = random_grid(seed)
+    score = Score()
+    tracker = ScoreTracker(grid, score)
+    tiles: list[Tile] = [Nothing, Iron, Oil, Base, WardenOutpost, ScoringTestBuilding]
+    for _ in range(100):
+        point = GridPoint(rng.randrange(grid.width), rng.randrange(grid.height))
+        old = grid[point]
+        grid[point] = rng.choice(tiles)
+        tracker.update(point, old)
+        assert tracker.totals == tracker.calculate()
+        assert score == Score(*tracker.totals)
@@ -0,0 +1,79 @@
+"""Loads every image and font once and shares it.
+
+Images are cached by file and scale, so each file is read from disk once and each scaled copy is made once, no
+matter how many components draw it or how often. Once the display exists, images are converted to its pixel
+format with convert_alpha, which makes drawing them much faster.
+
+Fonts are cached by file and size, and rendered text is kept in a least recently used cache, so text is only
+rendered again when it changes.
+
+Example:
+    from tiny_space.asset_manager import assets
+    surface.blit(assets.image(path, config.SCALE), (0, 0))
+    surface.blit(assets.text("Build", font_file, 18, (0, 0, 0)), (0, 0))
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+
+import pygame as pg
+
+
+class AssetManager:
+    # Number of rendered texts to keep.
+    max_texts = 256
+
+    def __init__(self):
+        self._images: dict[tuple[Path, float], pg.Surface] = {}
+        self._fonts: dict[tuple[Path, int], pg.font.Font] = {}
+        self._texts: OrderedDict[tuple, pg.Surface] = OrderedDict()
+        # Whether the cached images are in the display's pixel format.
+        self._converted = False
+
+    def image(self, path: Path | str, scale: float = 1) -> pg.Surface:
+        """Get the image at path, scaled by scale. The image is shared, so don't draw on it."""
+        if not self._converted and pg.display.get_surface() is not None:
+            # Images loaded before the display existed couldn't be converted, so load them again.
+            self._images.clear()
+            self._converted = True
+        key = (Path(path), scale)
+        if (image := self._images.get(key)) is None:
+            if scale == 1:
+                image = pg.image.load(path)
+                if self._converted:
+                    image = image.convert_alpha()
+            else:
+                image = pg.transform.scale_by(self.image(path), scale)
+            self._images[key] = image
+        return image
+
+    def font(self, path: Path | str, size: int) -> pg.font.Font:
+        key = (Path(path), size)
+        if (font := self._fonts.get(key)) is None:
+            font = self._fonts[key] = pg.font.Font(path, size)
+        return font
+
+    def text(
+        self,
+        text: str,
+        font_path: Path | str,
+        size: int,
+        color: pg.typing.ColorLike,
+        antialias: bool = True,
+        wraplength: int = 0,
+    ) -> pg.Surface:
+        """Render text, or reuse it if it was rendered recently. The surface is shared, so don't draw on it."""
+        key = (text, Path(font_path), size, tuple(pg.Color(color)), antialias, wraplength)
+        if (surface := self._texts.get(key)) is not None:
+            self._texts.move_to_end(key)
+            return surface
+        surface = self.font(font_path, size).render(text, antialias, color, wraplength=wraplength)
+        self._texts[key] = surface
+        if len(self._texts) > self.max_texts:
+            self._texts.popitem(last=False)
+        return surface
+
+
+assets = AssetManager()
@@ -0,0 +1,115 @@
+"""Bitboard representation of a grid.
+
+Each tile type gets an integer with one bit per cell, set where that tile is, plus one mask of every occupied
+cell. Cell (x, y) is bit y * width + x. Checking a schematic or looking for neighbours then only takes a few
+shifts and ANDs.
+
+Python integers are unbounded so any grid size works, but it is fastest for grids of up to 64 cells.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+
+from tiny_space.buildings import SchematicRotation
+from tiny_space.grid import Grid
+from tiny_space.helpers import ORTHOGONAL, GridPoint
+from tiny_space.thing import TILE_REGISTRY, Tile
+
+
+@cache
+def _neighbour_masks(width: int, height: int) -> tuple[int, ...]:
+    """For each cell, the mask of the cells orthogonally adjacent to it."""
+    masks = []
+    for y in range(height):
+        for x in range(width):
+            mask = 0
+            for direction in ORTHOGONAL:
+                nx, ny = x + direction.x, y + direction.y
+                if 0 <= nx < width and 0 <= ny < height:
+                    mask |= 1 << (ny * width + nx)
+            masks.append(mask)
+    return tuple(masks)
+
+
+@cache
+def _origin_mask(width: int, height: int, schematic_size: GridPoint) -> int:
+    """Mask of every offset at which a schematic of the given size fits on the board."""
+    row = (1 << (width - schematic_size.x + 1)) - 1
+    mask = 0
+    for y in range(height - schematic_size.y + 1):
+        mask |= row << (y * width)
+    return mask
+
+
+class Bitboard:
+    """A grid stored as one bitmask per tile type.
+
+    Methods:
+        from_grid(grid) -> Bitboard
+        set(point, tile)
+        has_adjacent(point) -> bool
+        match(rotation) -> Mask of every offset rotation fits at
+        points(mask) -> Points of the set bits of mask
+    """
+
+    def __init__(self, size: GridPoint):
+        self.size = size
+        self.width, self.height = size
+        self.occupied = 0
+        # Tile code -> mask of cells containing that tile. Nothing is not stored.
+        self.masks: dict[int, int] = {}
+        self._codes = bytearray(self.width * self.height)
+        self._neighbours = _neighbour_masks(self.width, self.height)
+
+    @classmethod
+    def from_grid(cls, grid: Grid) -> Bitboard:
+        bitboard = cls(grid.size)
+        for index, code in enumerate(grid.codes):
+            if code:
+                bitboard._set_code(index, code)
+        return bitboard
+
+    def __getitem__(self, point: GridPoint) -> Tile:
+        return TILE_REGISTRY[self._codes[point.y * self.width + point.x]]
+
+    def set(self, point: GridPoint, tile: Tile) -> None:
+        self._set_code(point.y * self.width + point.x, tile.code)
+
+    def _set_code(self, index: int, code: int) -> None:
+        bit = 1 << index
+        if old := self._codes[index]:
+            self.masks[old] &= ~bit
+        self._codes[index] = code
+        if code:
+            self.masks[code] = self.masks.get(code, 0) | bit
+            self.occupied |= bit
+        else:
+            self.occupied &= ~bit
+
+    def has_adjacent(self, point: GridPoint) -> bool:
+        """Return whether any cell orthogonally adjacent to point is occupied."""
+        return bool(self._neighbours[point.y * self.width + point.x] & self.occupied)
+
+    def match(self, rotation: SchematicRotation, within: int | None = None) -> int:
+        """Get a mask of every offset at which rotation fits, all checked at once.
+
+        Pass within to only check the offsets in that mask, it must only contain offsets the schematic fits in.
+        """
+        if rotation.size.x > self.width or rotation.size.y > self.height:
+            return 0
+        valid = _origin_mask(self.width, self.height, rotation.size) if within is None else within
+        for pos, tile in rotation.occupied:
+            valid &= self.masks.get(tile.code, 0) >> (pos.y * self.width + pos.x)
+            if not valid:
+                break
+        return valid
+
+    def points(self, mask: int) -> list[GridPoint]:
+        """Convert a mask back into the points of its set bits."""
+        points = []
+        while mask:
+            index = (mask & -mask).bit_length() - 1
+            points.append(GridPoint(index % self.width, index // self.width))
+            mask &= mask - 1
+        return points
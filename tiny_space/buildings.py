@@ -2,41 +2,96 @@
 
 Buildings are subclasses of Thing.
 Buildings are 'built' from collections of resources according to their Schematic.
+
+Apart from Base, buildings are defined in assets/buildings.toml. If TINY_SPACE_CACHE_DIR is set, the file is
+only parsed and its schematics rotated when it changes, the result is cached there and reused on later starts.
+The buildings can be imported from this module by name as usual, or found in BUILDINGS.
 """
 
 from __future__ import annotations
 
-from typing import Type
+import hashlib
+import importlib.resources
+import json
+import logging
+import os
+import tomllib
+from array import array
+from pathlib import Path
+from typing import Any, NamedTuple, Type
 
 from tiny_space.grid import Grid
-from tiny_space.helpers import add_spaces_to_camelcase
-from tiny_space.resources import Aerofoam, Crystal, Iron, Oil
-from tiny_space.thing import Nothing, Thing, Tile
+from tiny_space.helpers import GridPoint, add_spaces_to_camelcase
+from tiny_space.resources import Resource
+from tiny_space.thing import TILE_REGISTRY, Nothing, Thing, Tile
+
+BUILDINGS_FILE = Path(str(importlib.resources.files(__package__))) / "assets" / "buildings.toml"
+
+
+class SchematicRotation(NamedTuple):
+    """A building schematic at one of its four rotations.
+
+    These are computed once per building and shared, so the grid is frozen.
+    """
+
+    grid: Grid
+    size: GridPoint
+    # Offset and tile of every cell of the schematic that isn't Nothing.
+    occupied: tuple[tuple[GridPoint, Tile], ...]
+
+    @classmethod
+    def from_schematic(cls, schematic: Grid, rotation: int) -> SchematicRotation:
+        return cls.from_grid(schematic.rotate(rotation))
+
+    @classmethod
+    def from_grid(cls, grid: Grid) -> SchematicRotation:
+        grid.freeze()
+        occupied = tuple((pos, tile) for pos, tile in grid if tile is not Nothing)
+        return cls(grid, grid.size, occupied)
+
+
+class AdjacencyRule(NamedTuple):
+    """Score a building earns for each orthogonally adjacent tile that is a subclass of neighbour."""
+
+    neighbour: type
+    score: tuple[int, int, int, int]
 
 
 class Building(Thing):
     asset_subdir = "buildings"
     description = "I'm a building"
+    # Extra scores for neighbouring tiles, see scoring.py.
+    adjacency_rules: tuple[AdjacencyRule, ...] = ()
 
     # The 'recipe' to construct this building.
     _schematic: Grid | None = None
+    # The schematic at each rotation, precomputed when the building is defined.
+    _rotations: tuple[SchematicRotation, ...] = ()
 
     BUILDING_REGISTRY: list[Type[Building]] = []
 
     @classmethod
     def __init_subclass__(cls, **kwargs):
         cls.BUILDING_REGISTRY.append(cls)  # Add class to registry.
+        # Buildings loaded from the cache come with their rotations.
+        if cls._schematic is not None and "_rotations" not in cls.__dict__:
+            cls._rotations = tuple(SchematicRotation.from_schematic(cls._schematic, r) for r in range(4))
 
     @classmethod
     def is_buildable(cls) -> bool:
         return cls._schematic is not None
 
     @classmethod
-    def get_schematic(cls, rotation: int = 0) -> Grid:
-        """Get the schematic rotated by 90 degrees n times."""
-        if not cls._schematic:
+    def get_rotation(cls, rotation: int = 0) -> SchematicRotation:
+        """Get the schematic, its size and occupied cells rotated by 90 degrees n times."""
+        if not cls._rotations:
             raise ValueError(f"No schematic for {repr(cls)}")
-        return cls._schematic.rotate(rotation)
+        return cls._rotations[rotation % 4]
+
+    @classmethod
+    def get_schematic(cls, rotation: int = 0) -> Grid:
+        """Get the schematic rotated by 90 degrees n times. The returned grid is shared and read-only."""
+        return cls.get_rotation(rotation).grid
 
     @classmethod
     def get_name(cls) -> str:
@@ -52,64 +107,150 @@ def grid_from_transposed(schematic: list[list[Tile]]):
 class Base(Building): ...
 
 
-class WardenOutpost(Building):
-    description = "Gives 2 points for each adjacent Facility."
-    # schematic_list = [[Tile(Iron), Tile(Oil), Tile(Iron)], [Tile(Nothing), Tile(Aerofoam), Tile(Nothing)]]
-    schematic_list: list[list[Tile]] = [[Oil, Crystal, Crystal], [Nothing, Aerofoam, Nothing]]
-    _schematic = grid_from_transposed(schematic_list)
-
-
-class CommsTower(Building):
-    description = "aa a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a a"
-    schematic_list: list[list[Tile]] = [[Crystal, Iron, Crystal, Oil]]
-    _schematic = grid_from_transposed(schematic_list)
-
-
-class ArsenicScrubber(Building):
-    schematic_list: list[list[Tile]] = [[Nothing, Crystal], [Nothing, Oil], [Aerofoam, Iron]]
-    _schematic = grid_from_transposed(schematic_list)
-
-
-class Lorem(Building):
-    schematic_list: list[list[Tile]] = [[Nothing, Crystal], [Nothing, Oil], [Aerofoam, Iron]]
-    _schematic = grid_from_transposed(schematic_list)
-
-
-class Ipsum(Building):
-    schematic_list: list[list[Tile]] = [[Nothing, Crystal], [Nothing, Oil], [Aerofoam, Iron]]
-    _schematic = grid_from_transposed(schematic_list)
-
-
-class Dolor(Building):
-    schematic_list: list[list[Tile]] = [[Crystal], [Iron]]
-    _schematic = grid_from_transposed(schematic_list)
-
-
-class Sit(Building):
-    schematic_list: list[list[Tile]] = [[Aerofoam, Oil]]
-    _schematic = grid_from_transposed(schematic_list)
-
-
-class Amet(Building):
-    schematic_list: list[list[Tile]] = [[Oil]]
-    _schematic = grid_from_transposed(schematic_list)
-
-
-class Consectetur(Building):
-    schematic_list: list[list[Tile]] = [[Oil]]
-    _schematic = grid_from_transposed(schematic_list)
-
-
-class Adipisci(Building):
-    schematic_list: list[list[Tile]] = [[Oil]]
-    _schematic = grid_from_transposed(schematic_list)
-
-
-class Velit(Building):
-    schematic_list: list[list[Tile]] = [[Oil]]
-    _schematic = grid_from_transposed(schematic_list)
-
-
-class Eidesis(Building):
-    schematic_list: list[list[Tile]] = [[Oil]]
-    _schematic = grid_from_transposed(schematic_list)
+class BuildingDefinition(NamedTuple):
+    """A building from the data file, compiled into plain data so it can be cached.
+
+    Tiles are stored by name, as tile codes depend on the order Things are defined in.
+    """
+
+    name: str
+    description: str
+    score: list[int]
+    asset: str | None
+    # (neighbour name, score) of each adjacency rule.
+    adjacency: tuple[tuple[str, tuple[int, int, int, int]], ...]
+    # Width, height and row-major tile names of the schematic at each rotation.
+    rotations: tuple[tuple[int, int, tuple[str, ...]], ...]
+
+
+def resolve_schematic(data: dict[str, Any], name: str) -> list[list[str]]:
+    """Get the rows of a building's schematic, following references to other buildings' schematics."""
+    seen = [name]
+    schematic = data[name].get("schematic")
+    while isinstance(schematic, str):
+        if schematic not in data:
+            raise ValueError(f"{name}'s schematic refers to unknown building {schematic!r}.")
+        if schematic in seen:
+            raise ValueError(f"{name}'s schematic refers back to itself: {' -> '.join(seen + [schematic])}.")
+        seen.append(schematic)
+        schematic = data[schematic].get("schematic")
+    if not isinstance(schematic, list):
+        raise ValueError(f"{name} has no schematic.")
+    return schematic
+
+
+def compile_buildings(text: str) -> list[BuildingDefinition]:
+    """Parse the buildings data file, check every name in it and rotate every schematic."""
+    tiles = {repr(tile): tile for tile in TILE_REGISTRY}
+    data = tomllib.loads(text)
+    definitions = []
+    for name, entry in data.items():
+        rows = resolve_schematic(data, name)
+        for tile_name in {cell for row in rows for cell in row}:
+            if tile_name != "Nothing" and not issubclass(tiles.get(tile_name, Nothing), Resource):
+                raise ValueError(f"{name}'s schematic has unknown resource {tile_name!r}.")
+        for rule in entry.get("adjacency", ()):
+            # Neighbours can be any Thing, including buildings anywhere in the file.
+            if rule["neighbour"] not in tiles and rule["neighbour"] not in data:
+                raise ValueError(f"{name}'s adjacency has unknown neighbour {rule['neighbour']!r}.")
+        schematic = grid_from_transposed([[tiles[tile_name] for tile_name in row] for row in rows])
+        rotations = []
+        for rotation in range(4):
+            grid = schematic.rotate(rotation)
+            rotations.append((grid.width, grid.height, tuple(repr(TILE_REGISTRY[code]) for code in grid.codes)))
+        definitions.append(
+            BuildingDefinition(
+                name,
+                entry.get("description", Building.description),
+                entry.get("score", [0, 0, 0, 0]),
+                entry.get("asset"),
+                tuple((rule["neighbour"], tuple(rule["score"])) for rule in entry.get("adjacency", ())),
+                tuple(rotations),
+            )
+        )
+    return definitions
+
+
+def definition_from_json(entry: list) -> BuildingDefinition:
+    """Rebuild a definition read back from JSON, which turned its tuples into lists."""
+    name, description, score, asset, adjacency, rotations = entry
+    return BuildingDefinition(
+        name,
+        description,
+        score,
+        asset,
+        tuple((neighbour, tuple(rule_score)) for neighbour, rule_score in adjacency),
+        tuple((width, height, tuple(names)) for width, height, names in rotations),
+    )
+
+
+def load_definitions(path: Path = BUILDINGS_FILE) -> list[BuildingDefinition]:
+    """Compile the building definitions, or load them from TINY_SPACE_CACHE_DIR if they're cached there."""
+    data = path.read_bytes()
+    if not (cache_dir := os.environ.get("TINY_SPACE_CACHE_DIR")):
+        return compile_buildings(data.decode())
+    # The result also depends on this compiler and the tiles it can refer to.
+    key = hashlib.sha256(Path(__file__).read_bytes())
+    key.update(",".join(repr(tile) for tile in TILE_REGISTRY).encode())
+    key.update(data)
+    cache_file = Path(cache_dir) / f"buildings-{key.hexdigest()[:16]}.json"
+    try:
+        return [definition_from_json(entry) for entry in json.loads(cache_file.read_text())]
+    except FileNotFoundError:
+        pass
+    except (ValueError, TypeError) as e:
+        logging.warning(f"Ignoring unreadable building cache {cache_file}: {e!r}")
+    definitions = compile_buildings(data.decode())
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps(definitions))
+    except OSError as e:
+        logging.warning(f"Couldn't cache buildings in {cache_file}: {e}")
+    return definitions
+
+
+def define_buildings(definitions: list[BuildingDefinition]) -> dict[str, Type[Building]]:
+    """Make the Building subclasses described by definitions, by name.
+
+    Adjacency rules are added once every building exists, as they can refer to buildings defined later.
+    """
+    defined = {definition.name: define_building(definition) for definition in definitions}
+    tiles = {repr(tile): tile for tile in TILE_REGISTRY}
+    for definition in definitions:
+        defined[definition.name].adjacency_rules = tuple(
+            AdjacencyRule(tiles[neighbour], score) for neighbour, score in definition.adjacency
+        )
+    return defined
+
+
+def define_building(definition: BuildingDefinition) -> Type[Building]:
+    """Make the Building subclass described by a definition, without its adjacency rules."""
+    tiles = {repr(tile): tile for tile in TILE_REGISTRY}
+    rotations = tuple(
+        SchematicRotation.from_grid(
+            Grid._from_cells(width, height, array("B", [tiles[tile_name].code for tile_name in names]))
+        )
+        for width, height, names in definition.rotations
+    )
+    namespace: dict[str, Any] = {
+        "__module__": __name__,
+        "description": definition.description,
+        "score": definition.score,
+        "_schematic": rotations[0].grid,
+        "_rotations": rotations,
+    }
+    if definition.asset:
+        namespace["asset"] = definition.asset
+    return type(definition.name, (Building,), namespace)
+
+
+# Every building from the data file, by name.
+BUILDINGS: dict[str, Type[Building]] = define_buildings(load_definitions())
+
+
+def __getattr__(name: str) -> Type[Building]:
+    """Allow importing buildings from the data file like the buildings defined here."""
+    try:
+        return BUILDINGS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
@@ -10,6 +10,9 @@ from tiny_space.grid import Grid
 from tiny_space.helpers import GridPoint
 from tiny_space.resources import Resource
 
+# The shape of the cursor when it isn't holding a schematic.
+RESOURCE_SHAPE = Grid([[Resource]]).freeze()
+
 
 class CursorStates(Enum):
     RESOURCE_PLACE = 1
@@ -50,7 +53,7 @@ class Cursor:
 
     def get_shape(self) -> Grid:
         if self._state in [CursorStates.RESOURCE_PLACE, CursorStates.BUILD_LOCATION]:
-            return Grid([[Resource]])
+            return RESOURCE_SHAPE
 
         assert self.selected_structure
         return self.selected_structure.get_schematic(self.rotation)
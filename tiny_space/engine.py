@@ -0,0 +1,261 @@
+"""Headless rules engine.
+
+GameState owns everything needed to play a game: the grid, the resource queue and the score. It doesn't
+import pygame or touch the global cursor, so games can be simulated without a display and several games can
+run in one process. World renders a GameState and turns mouse clicks into calls to it.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AbstractSet, Type
+
+from tiny_space import buildings
+from tiny_space.bitboard import Bitboard
+from tiny_space.grid import Grid, grid_points, neighbour_indices
+from tiny_space.helpers import GridPoint
+from tiny_space.matching import Placement, PlacementIndex
+from tiny_space.resources import Resource, ResourceQueue
+from tiny_space.score import Score
+from tiny_space.scoring import ScoreTracker
+from tiny_space.thing import Nothing, Tile
+
+if TYPE_CHECKING:
+    from tiny_space.replay import ReplayLog
+
+
+# Moves are dataclasses rather than NamedTuples, as Point raises when compared against other types.
+@dataclass(frozen=True)
+class PlaceResource:
+    """Place the next resource in the queue at point."""
+
+    point: GridPoint
+
+
+@dataclass(frozen=True)
+class Build:
+    """Build placement, consuming its resources and putting the building at location.
+
+    Location must be one of the tiles the placement's schematic covers.
+    """
+
+    placement: Placement
+    location: GridPoint
+
+
+Move = PlaceResource | Build
+
+
+@dataclass
+class JournalEntry:
+    """A move that was made and everything needed to undo it."""
+
+    move: Move
+    # Each tile the move changed and what it was before, in the order they were changed.
+    changes: list[tuple[GridPoint, Tile]]
+    # The resource the move took from the queue, and the queue's last_resource_taken before that.
+    resource: Type[Resource] | None = None
+    last_resource_taken: Type[Resource] | None = None
+
+
+class GameState:
+    default_grid_size = GridPoint(5, 7)
+
+    def __init__(
+        self,
+        grid_size: GridPoint = default_grid_size,
+        queue: ResourceQueue | None = None,
+        score: Score | None = None,
+    ):
+        self.grid = Grid.from_dimensions(grid_size)
+        self.queue = queue or ResourceQueue()
+        self.score = score or Score()
+        self.score_tracker = ScoreTracker(self.grid, self.score)
+        # Bitboard copy of the grid and every building that could be built right now, kept up to date by set_tile.
+        self.bitboard = Bitboard(grid_size)
+        self.placements = PlacementIndex(self.bitboard)
+        # Empty tiles next to a filled tile, where resources can be placed. Kept up to date by set_tile.
+        self.frontier: set[GridPoint] = set()
+        self._points = grid_points(*grid_size)
+        self._neighbours = neighbour_indices(*grid_size)
+        # Number of filled tiles.
+        self.occupied = 0
+        # Number of resources placed and buildings built.
+        self.turn = 0
+        self.buildings_built = 0
+        # Records every move once start_recording is called.
+        self.log: ReplayLog | None = None
+        # Moves that have been made, to be undone, and moves that were undone, to be redone.
+        self.history: list[JournalEntry] = []
+        self.future: list[Move] = []
+        self.set_tile(self.grid.size // 2, buildings.Base)
+
+    def start_recording(self) -> ReplayLog:
+        """Record every move so this game can be replayed. Call this before making any moves."""
+        from tiny_space.replay import ReplayLog
+
+        if self.history:
+            raise ValueError("Replays start from a new game, so recording must start before any moves are made.")
+        self.log = ReplayLog(self)
+        return self.log
+
+    def set_tile(self, point: GridPoint, thing: Tile):
+        """Change a tile, keeping everything derived from the grid up to date."""
+        old = self.grid[point]
+        self.grid[point] = thing
+        self.score_tracker.update(point, old)
+        self.bitboard.set(point, thing)
+        self.placements.update(point)
+        if (old is Nothing) != (thing is Nothing):
+            self.occupied += 1 if old is Nothing else -1
+            self._update_frontier(point)
+
+    def _update_frontier(self, point: GridPoint):
+        """Update the frontier around point, after it was filled or emptied."""
+        neighbours = [self._points[n] for n in self._neighbours[point.y * self.grid.width + point.x]]
+        if self.grid[point] is not Nothing:
+            self.frontier.discard(point)
+            self.frontier.update(n for n in neighbours if self.bitboard[n] is Nothing)
+            return
+        if self.bitboard.has_adjacent(point):
+            self.frontier.add(point)
+        for neighbour in neighbours:
+            if self.bitboard[neighbour] is Nothing and not self.bitboard.has_adjacent(neighbour):
+                self.frontier.discard(neighbour)
+
+    def has_adjacent_tile(self, grid_coord: GridPoint) -> bool:
+        """Returns True if an adjacent tile isn't empty."""
+        return self.bitboard.has_adjacent(grid_coord)
+
+    def is_full(self) -> bool:
+        """Returns True if every tile is filled."""
+        return self.occupied == self.grid.width * self.grid.height
+
+    @property
+    def is_over(self) -> bool:
+        """The game is over when no resource can be placed and nothing can be built to make space."""
+        return not self.frontier and not self.placements
+
+    def fill_tile(self, point: GridPoint, thing: Type[Resource] | Type[buildings.Building]) -> bool:
+        """Fill the tile, if possible.
+
+        Filling a tile is not possible if it's already filled or if there are no adjacent filled tiles.
+        """
+        if point in self.frontier:
+            self.set_tile(point, thing)
+            return True
+        # Only illegal moves get this far, work out why.
+        if not self.grid.is_in_grid(point):
+            logging.warning(f"Illegal move: {point} is not in the grid.")
+            return False
+        if self.grid[point] is not Nothing:
+            logging.warning(f"Illegal move: Can't fill occupied tile at {point}.")
+            return False
+        logging.warning(f"Illegal move: Can't fill disconnected tile at {point}.")
+        return False
+
+    def place_resource(self, point: GridPoint) -> bool:
+        """Place the next resource from the queue at point, if possible."""
+        last_resource_taken = self.queue.last_resource_taken
+        if not self.fill_tile(point, self.queue.peek()):
+            return False
+        resource = self.queue.take()
+        self.turn += 1
+        self._record(JournalEntry(PlaceResource(point), [(point, Nothing)], resource, last_resource_taken))
+        if self.log:
+            self.log.place(point)
+        return True
+
+    def can_build(self, placement: Placement, location: GridPoint) -> bool:
+        """Return whether placement can be built with the building put at location."""
+        return placement in self.placements and self._covers(placement, location)
+
+    @staticmethod
+    def _covers(placement: Placement, location: GridPoint) -> bool:
+        """Return whether location is one of the resources used by placement."""
+        schematic = placement.building.get_schematic(placement.rotation)
+        relative = location - placement.offset
+        return schematic.is_in_grid(relative) and schematic[relative] is not Nothing
+
+    def build(self, placement: Placement, location: GridPoint) -> bool:
+        """Replace the resources covered by placement with its building at location, if possible."""
+        if placement not in self.placements:
+            logging.warning(f"Illegal move: Can't build {placement.building} at {placement.offset}.")
+            return False
+        if not self._covers(placement, location):
+            logging.warning("Invalid building placement, returning to resource placement.")
+            return False
+        changes = []
+        for pos, _tile in placement.building.get_rotation(placement.rotation).occupied:
+            changes.append((placement.offset + pos, self.grid[placement.offset + pos]))
+            self.set_tile(placement.offset + pos, Nothing)
+        changes.append((location, Nothing))
+        self.set_tile(location, placement.building)
+        self.buildings_built += 1
+        self._record(JournalEntry(Build(placement, location), changes))
+        if self.log:
+            self.log.build(placement, location)
+        return True
+
+    def apply(self, move: Move) -> bool:
+        """Make a move, returning whether it was legal."""
+        if isinstance(move, PlaceResource):
+            return self.place_resource(move.point)
+        return self.build(move.placement, move.location)
+
+    def _record(self, entry: JournalEntry) -> None:
+        self.history.append(entry)
+        # A new move replaces whatever was undone. Redo keeps hold of the old list, so this mustn't clear it.
+        self.future = []
+
+    def undo(self) -> Move | None:
+        """Undo the last move, returning it, or None if there's nothing to undo.
+
+        Only the tiles the move changed are restored, so this costs about as much as making the move.
+        """
+        if not self.history:
+            return None
+        entry = self.history.pop()
+        for point, old in reversed(entry.changes):
+            self.set_tile(point, old)
+        if isinstance(entry.move, PlaceResource):
+            assert entry.resource
+            self.queue.untake(entry.resource, entry.last_resource_taken)
+            self.turn -= 1
+        else:
+            self.buildings_built -= 1
+        if self.log:
+            self.log.undo()
+        self.future.append(entry.move)
+        return entry.move
+
+    def redo(self) -> Move | None:
+        """Redo the last undone move, returning it, or None if there's nothing to redo."""
+        if not self.future:
+            return None
+        future = self.future
+        move = future.pop()
+        applied = self.apply(move)
+        assert applied, f"Couldn't redo {move}"
+        self.future = future
+        return move
+
+    def legal_resource_moves(self) -> AbstractSet[GridPoint]:
+        """Get every tile the next resource can be placed on. This is the live frontier, don't modify it."""
+        return self.frontier
+
+    def legal_build_moves(self) -> list[Build]:
+        return [
+            Build(placement, placement.offset + pos)
+            for placement in self.placements
+            for pos, _tile in placement.building.get_rotation(placement.rotation).occupied
+        ]
+
+    def legal_moves(self) -> list[Move]:
+        """Get every move that can be made right now."""
+        return [*(PlaceResource(point) for point in self.frontier), *self.legal_build_moves()]
+
+    def calculate_score(self) -> list[int]:
+        """Add up the score of the whole grid from scratch. The score is kept up to date without this."""
+        return self.score_tracker.calculate()
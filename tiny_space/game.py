@@ -5,12 +5,13 @@ import logging
 import platform
 import sys
 from enum import Enum
+from typing import Hashable
 
 import pygame as pg
 
 import config
 from tiny_space import debug
-from tiny_space.helpers import Point
+from tiny_space.helpers import Point, events
 from tiny_space.sidebar import Sidebar
 from tiny_space.templates import GraphicsComponent
 from tiny_space.world import World
@@ -30,6 +31,9 @@ class Game:
         self.world: World
         self.sidebar: Sidebar
         self.surfaces: list[tuple[Point, GraphicsComponent]] = []
+        # What each surface looked like when it was last drawn, so unchanged surfaces aren't drawn again.
+        self.render_states: dict[GraphicsComponent, Hashable | None] = {}
+        self.redraw_all = True
 
         pg.init()
         pg.display.set_caption("Tiny Space")
@@ -50,6 +54,8 @@ class Game:
 
     def reset(self):
         """Reset the game and start it again."""
+        if hasattr(self, "world"):
+            self.world.save_replay()
         # The Sidebar occupies the right 30% of the display.
         horizontal_split = int(self._screen.get_width() * 0.7)
         sidebar_width = self._screen.get_width() - horizontal_split
@@ -65,6 +71,8 @@ class Game:
             (Point(*world_pos), self.world),
             (Point(horizontal_split, 0), self.sidebar),
         ]
+        self.render_states = {}
+        self.redraw_all = True
         self.state = State.RUNNING
 
     def process_key_input(self, event):
@@ -74,6 +82,10 @@ class Game:
                 self.state = State.QUITTING
             case pg.K_r:
                 self.reset()
+            case pg.K_z:
+                self.world.undo()
+            case pg.K_y:
+                self.world.redo()
             # These numbers can be used for Debug commands.
             case pg.K_1:
                 debug.debug_1()
@@ -98,6 +110,9 @@ class Game:
             self.process_key_input(event)
         elif event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
             self.process_mouse_input(event)
+        elif event.type in (pg.WINDOWEXPOSED, pg.WINDOWSIZECHANGED, pg.VIDEOEXPOSE):
+            # The window's contents may have been lost.
+            self.redraw_all = True
 
     def process_inputs(self):
         """Handle all user input since the last time this ran."""
@@ -110,26 +125,51 @@ class Game:
             surface.update(time_delta)
 
     def render(self):
-        """Draw all the surfaces to the display."""
+        """Draw the surfaces that have changed to the display, and update only those parts of it."""
         mouse_pos = Point(*pg.mouse.get_pos())
-        self._screen.fill((0, 0, 0))
+        if self.redraw_all:
+            self._screen.fill((0, 0, 0))
+        dirty_rects = []
         for pos, surface in self.surfaces:
+            state = surface.render_state(mouse_pos - pos)
+            if not self.redraw_all and state is not None and state == self.render_states.get(surface):
+                continue
+            self.render_states[surface] = state
             rect = pg.Rect(*pos, *surface.surface.get_size())
             assert rect in self._screen.get_rect(), f"{rect} does not fit in display!"
-            if surface == self.world:
+            if surface == self.world and self.redraw_all:
                 # Draw a nice border. Bordered surfaces should ideally be less hacky...
                 width, height = surface.surface.get_size()
                 pg.draw.rect(self._screen, (30, 30, 200), (pos[0] - 1, pos[1] - 1, width + 2, height + 2))
             self._screen.blit(surface.render(mouse_pos - pos), pos)
-        pg.display.update()
+            dirty_rects.append(rect)
+        if self.redraw_all:
+            pg.display.update()
+            self.redraw_all = False
+        elif dirty_rects:
+            pg.display.update(dirty_rects)
+
+    def is_animating(self) -> bool:
+        return any(surface.is_animating() for _pos, surface in self.surfaces)
+
+    async def wait_for_input(self):
+        """Wait for input while nothing is animating, as nothing else changes what's on screen."""
+        if sys.platform == "emscripten":
+            # Blocking would freeze the browser, so check for input less often instead.
+            await asyncio.sleep(1 / config.IDLE_FPS)
+        elif (event := pg.event.wait(config.IDLE_TIMEOUT)).type != pg.NOEVENT:
+            self.process_input(event)
 
     async def main(self):
         while True:
-            # Limit FPS to 60
-            time_delta = self.clock.tick(60) / 1000.0
+            if self.state == State.RUNNING and not self.is_animating():
+                await self.wait_for_input()
+            time_delta = self.clock.tick(config.FPS) / 1000.0
             await asyncio.sleep(0)
             if self.state == State.RUNNING:
                 self.process_inputs()
+                # Send the events from this frame's input before anything is updated or drawn.
+                events.flush()
                 self.update(time_delta)
                 self.render()
             elif self.state is State.RESTARTING:
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from typing import Iterator, overload
+import random
+from array import array
+from functools import cache
+from typing import Iterator, Sequence, overload
 
-from tiny_space.thing import Nothing, Tile
+from tiny_space.thing import TILE_REGISTRY, Nothing, Tile
 
 from .helpers import GridPoint
 
@@ -15,6 +18,9 @@ class Grid:
 
     Try avoid any logic specific to the game for compatibility with other projects.
 
+    Tiles are stored as their integer tile codes in a flat row-major array, so grids are compact
+    and cheap to copy, compare and scan. Only registered tile classes (see thing.py) can be stored.
+
     You can index similarly to a real list[list[object]]
     g = Grid([
         [Iron, Oil],
@@ -26,67 +32,93 @@ class Grid:
     g[0]
     > [Iron, Alice]
 
+    Note g[0] returns a copy of the column, assigning to it does not modify the grid.
+
     You can iterate through all tiles in the grid like this:
     g = Grid(...)
     for point, tile in g:
         assert g[point] == tile
 
+    Grids are hashable using a Zobrist hash which is updated on every assignment, so hashing is O(1) and
+    equality checks can usually be decided by the hash alone. Don't modify a grid while it is a dict key,
+    copy or freeze it first. The hash comes from tile codes, which depend on the order Things are defined in, so
+    don't store it between runs.
+
+    Attributes:
+        width: int
+        height: int
+        size: GridPoint
+        zobrist: int
+
     Methods:
         from_dimensions(size) -> Grid
         is_in_grid(point: GridPoint) -> bool
-        height() -> int
-        width() -> int
+        get_subgrid(x, y, width, height) -> Copy of part of the Grid and its offset
+        to_bytes() -> Tile codes in row-major order
         rotate(n) -> Rotated copy of Grid
+        copy() -> Copy of Grid
+        freeze() -> Make this grid read-only
     """
 
-    def __init__(self, initial: list[list[Tile]]):
-        self._grid = initial
+    def __init__(self, initial: Sequence[Sequence[Tile]]):
+        self.width = len(initial)
+        self.height = len(initial[0])
+        self.size = GridPoint(self.width, self.height)
+        self._cells = array("B", [initial[x][y].code for y in range(self.height) for x in range(self.width)])
+        self.zobrist = _zobrist_hash(self._cells)
+        self._frozen = False
+
+    @classmethod
+    def _from_cells(cls, width: int, height: int, cells: array, zobrist: int | None = None) -> Grid:
+        """Wrap an existing row-major array of tile codes without copying it."""
+        grid = cls.__new__(cls)
+        grid.width = width
+        grid.height = height
+        grid.size = GridPoint(width, height)
+        grid._cells = cells
+        grid.zobrist = _zobrist_hash(cells) if zobrist is None else zobrist
+        grid._frozen = False
+        return grid
 
     @classmethod
     def from_dimensions(cls, size: GridPoint):
         """Make a grid of Nothing objects of the given dimensions."""
-        return cls([[Nothing for _ in range(size.y)] for _ in range(size.x)])
+        assert Nothing.code == 0
+        return cls._from_cells(size.x, size.y, array("B", bytes(size.x * size.y)), zobrist=0)
+
+    def copy(self) -> Grid:
+        """Get a modifiable copy of this grid."""
+        return Grid._from_cells(self.width, self.height, array("B", self._cells), zobrist=self.zobrist)
+
+    def __hash__(self):
+        return hash((self.width, self.height, self.zobrist))
 
     def __eq__(self, other):
         if not isinstance(other, Grid):
             return False
-        return not any(pos1 != pos2 or tile1 != tile2 for (pos1, tile1), (pos2, tile2) in zip(self, other, strict=True))
+        return self.size == other.size and self.zobrist == other.zobrist and self._cells == other._cells
 
     def __repr__(self):
-        string = "[["
-        row_count = 0
-        for pos, item in self:
-            if pos.y != row_count:
-                row_count = pos.y
-                string = f"{string[:-2]}], ["
-            string += f"{item}, "
-        return f"{string[:-2]}]]"
-
-    @property
-    def size(self):
-        return GridPoint(len(self._grid), len(self._grid[0]))
+        rows = (
+            ", ".join(repr(TILE_REGISTRY[code]) for code in self._cells[y * self.width : (y + 1) * self.width])
+            for y in range(self.height)
+        )
+        return f"[[{'], ['.join(rows)}]]"
 
     def is_in_grid(self, point: GridPoint) -> bool:
         """Return whether point lies in the grid"""
-        return 0 <= point.x < self.size.x and 0 <= point.y < self.size.y
+        return 0 <= point.x < self.width and 0 <= point.y < self.height
 
     def get_subgrid(self, x, y, width, height) -> tuple[Grid, GridPoint]:
         """Return a Grid consisting of a subgrid of self"""
-        # TODO: Clean this up.
-        sub_list = [column[y : y + height] for column in self._grid[x : x + width]]
-        subgrid = Grid(sub_list[:])
-        assert subgrid.size == GridPoint(width, height), f"{subgrid.size} is not equal to {GridPoint(width, height)}!"
-        return subgrid, GridPoint(x, y)
-
-    @property
-    def height(self) -> int:
-        """Get the number of rows"""
-        return self.size.y
-
-    @property
-    def width(self) -> int:
-        """Get the number of cols"""
-        return self.size.x
+        assert (
+            x >= 0 and y >= 0 and x + width <= self.width and y + height <= self.height
+        ), f"{GridPoint(width, height)} at {GridPoint(x, y)} does not fit in {self.size}!"
+        cells = array("B")
+        for row in range(y, y + height):
+            start = row * self.width + x
+            cells.extend(self._cells[start : start + width])
+        return Grid._from_cells(width, height, cells), GridPoint(x, y)
 
     @overload
     def __getitem__(self, index: int) -> list[Tile]: ...
@@ -97,23 +129,103 @@ class Grid:
     def __getitem__(self, index: int | tuple) -> list[Tile] | Tile:
         """Retrieve elements of the map at the given row or (row, col) pair"""
         if isinstance(index, int):
-            return self._grid[index]
-        elif isinstance(index, (tuple, GridPoint)):
-            index = GridPoint(*index)
-            return self._grid[index.x][index.y]
+            if not 0 <= index < self.width:
+                raise IndexError(f"Column {index} is not in grid of size {self.size}")
+            return [TILE_REGISTRY[code] for code in self._cells[index :: self.width]]
+        elif isinstance(index, tuple):
+            return TILE_REGISTRY[self._cells[self._index(*index)]]
         raise ValueError
 
     def __setitem__(self, index: GridPoint, value: Tile):
-        self._grid[index.x][index.y] = value
+        if self._frozen:
+            raise TypeError("Can't modify a frozen Grid, modify a copy instead.")
+        cell = self._index(*index)
+        self.zobrist ^= _zobrist_key(cell, self._cells[cell]) ^ _zobrist_key(cell, value.code)
+        self._cells[cell] = value.code
+
+    def _index(self, x: int, y: int) -> int:
+        """Get the position of (x, y) in the flat cell array."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"{GridPoint(x, y)} is not in grid of size {self.size}")
+        return y * self.width + x
 
     def __iter__(self) -> Iterator[tuple[GridPoint, Tile]]:
-        for y in range(self.height):
-            for x in range(self.width):
-                yield GridPoint(x, y), self[x, y]
+        tiles = TILE_REGISTRY
+        for point, code in zip(grid_points(self.width, self.height), self._cells, strict=True):
+            yield point, tiles[code]
+
+    @property
+    def codes(self) -> memoryview:
+        """Read-only view of the tile code of every cell, in row-major order."""
+        return memoryview(self._cells).toreadonly()
+
+    def to_bytes(self) -> bytes:
+        """Get the tile code of every cell, in row-major order."""
+        return self._cells.tobytes()
+
+    def freeze(self) -> Grid:
+        """Make this grid read-only so it can be safely shared. Returns self."""
+        self._frozen = True
+        return self
 
     def rotate(self, times: int) -> Grid:
         """Get a copy of this grid rotated by 90 degrees n times."""
-        grid: list[list[Tile]] = self._grid
-        for _ in range(times):
-            grid = list(zip(*grid[::-1], strict=True))  # type: ignore[arg-type]
-        return Grid(grid)
+        times %= 4
+        width, height = (self.height, self.width) if times % 2 else (self.width, self.height)
+        order = _rotation_order(self.width, self.height, times)
+        return Grid._from_cells(width, height, array("B", map(self._cells.__getitem__, order)))
+
+
+@cache
+def _zobrist_key(cell: int, code: int) -> int:
+    """Random 64 bit key for a tile code at a cell index. Seeded rather than using hash() so keys are reproducible."""
+    if code == 0:
+        # Empty cells don't contribute, so an empty grid hashes to 0.
+        return 0
+    return random.Random(cell << 8 | code).getrandbits(64)
+
+
+def _zobrist_hash(cells: array) -> int:
+    """XOR together the keys of every cell."""
+    zobrist = 0
+    for cell, code in enumerate(cells):
+        if code:
+            zobrist ^= _zobrist_key(cell, code)
+    return zobrist
+
+
+@cache
+def grid_points(width: int, height: int) -> tuple[GridPoint, ...]:
+    """Every point of a grid of the given dimensions, in row-major (iteration) order.
+
+    Cached so that iterating grids doesn't allocate a GridPoint per tile.
+    """
+    return tuple(GridPoint(x, y) for y in range(height) for x in range(width))
+
+
+@cache
+def neighbour_indices(width: int, height: int) -> tuple[tuple[int, ...], ...]:
+    """For each cell index of a grid of the given dimensions, the indices of its orthogonal neighbours."""
+    return tuple(
+        tuple(
+            (y + dy) * width + x + dx
+            for dx, dy in ((-1, 0), (1, 0), (0, 1), (0, -1))
+            if 0 <= x + dx < width and 0 <= y + dy < height
+        )
+        for y in range(height)
+        for x in range(width)
+    )
+
+
+@cache
+def _rotation_order(width: int, height: int, times: int) -> tuple[int, ...]:
+    """Source cell index for each cell of a grid rotated by 90 degrees n times."""
+    match times:
+        case 0:
+            return tuple(range(width * height))
+        case 1:
+            return tuple(y * width + (width - 1 - x) for x in range(width) for y in range(height))
+        case 2:
+            return tuple((height - 1 - y) * width + (width - 1 - x) for y in range(height) for x in range(width))
+        case _:
+            return tuple((height - 1 - y) * width + x for x in range(width) for y in range(height))
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import inspect
 import re
-from abc import ABC, abstractmethod
+import weakref
+from collections import defaultdict
 from enum import Enum
-from typing import NamedTuple, Self
+from typing import Callable, NamedTuple, Self
 
 
 class Point(NamedTuple):
@@ -77,51 +79,65 @@ ORTHOGONAL = [LEFT, RIGHT, DOWN, UP]
 
 
 class Event(Enum):
-    """Event types to be sent via Notifier."""
+    """Event types to be sent via the EventBus."""
 
     PlaceResource = 1
     PlaceBuilding = 2
+    GameOver = 3
+    Undo = 4
 
 
-class Notifier:
-    """A simple Observer pattern implementation.
+class EventBus:
+    """Sends events to the callbacks subscribed to their type.
 
-    Objects can be subclassed from Observer
-    """
-
-    # List of subscribers.
-    _observers: list[Observer] = []
-
-    @classmethod
-    def attach(cls, observer: Observer) -> None:
-        cls._observers.append(observer)
-
-    @classmethod
-    def detach(cls, observer: Observer) -> None:
-        cls._observers.remove(observer)
+    Callbacks are held by weak reference, so a component that is thrown away (like the sidebar on every reset)
+    stops receiving events without having to unsubscribe, and dead callbacks are dropped the next time their
+    event is sent. Events can be sent straight away with publish, or queued with post and sent in one batch by
+    flush, which the game calls once a frame.
 
-    @classmethod
-    def notify(cls, event: Event) -> None:
-        """
-        Trigger an update in each subscriber.
-        """
-        for observer in cls._observers:
-            observer.event_listener(event)
-
-
-class Observer(ABC):
-    """Subclass from Observer to receive events."""
-
-    def __init__(self, **kwargs):
-        Notifier.attach(self)
-        super().__init__(**kwargs)
+    Example:
+        events.subscribe(Event.GameOver, self.on_game_over)
+        events.post(Event.GameOver)
+    """
 
-    @abstractmethod
-    def event_listener(self, event: Event) -> None:
-        """
-        Receive update from subject.
-        """
-        raise NotImplementedError
+    def __init__(self):
+        self._subscribers: dict[Event, list[weakref.ref]] = defaultdict(list)
+        self._queue: list[Event] = []
+
+    def subscribe(self, event: Event, callback: Callable[[Event], None]) -> None:
+        ref = weakref.WeakMethod(callback) if inspect.ismethod(callback) else weakref.ref(callback)
+        self._subscribers[event].append(ref)
+
+    def unsubscribe(self, event: Event, callback: Callable[[Event], None]) -> None:
+        self._subscribers[event] = [ref for ref in self._subscribers[event] if ref() not in (callback, None)]
+
+    def publish(self, event: Event) -> None:
+        """Send event to its subscribers now."""
+        subscribers = self._subscribers.get(event)
+        if not subscribers:
+            return
+        dead = False
+        for ref in subscribers:
+            if (callback := ref()) is None:
+                dead = True
+            else:
+                callback(event)
+        if dead:
+            self._subscribers[event] = [ref for ref in self._subscribers[event] if ref() is not None]
+
+    def post(self, event: Event) -> None:
+        """Queue event to be sent on the next flush."""
+        self._queue.append(event)
+
+    def flush(self) -> None:
+        """Send every queued event, in the order they were posted."""
+        while self._queue:
+            queue, self._queue = self._queue, []
+            for event in queue:
+                self.publish(event)
+
+
+events = EventBus()
 
 
 def add_spaces_to_camelcase(text: str) -> str:
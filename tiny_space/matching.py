@@ -0,0 +1,138 @@
+"""Find every place buildings can be built on a grid.
+
+Rather than checking each subgrid in turn, the grid is turned into a Bitboard, with one mask per tile type.
+Shifting a mask by a schematic cell's offset lines every cell up with the placement it would belong to, so
+ANDing the shifted masks of each schematic cell checks every offset on the board at once.
+
+Many buildings share a schematic, and symmetric schematics look the same at several rotations. The
+SchematicLibrary only keeps each distinct shape once, so every shape is matched once and its matches are
+shared out to each (building, rotation) with that shape.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+from typing import Iterable, Iterator, NamedTuple, Type
+
+from tiny_space.bitboard import Bitboard
+from tiny_space.buildings import Building, SchematicRotation
+from tiny_space.grid import Grid
+from tiny_space.helpers import GridPoint
+
+
+class Placement(NamedTuple):
+    """A building at a rotation, with the top left of its schematic at offset."""
+
+    building: Type[Building]
+    rotation: int
+    offset: GridPoint
+
+
+def buildable_buildings() -> list[Type[Building]]:
+    return [building for building in Building.BUILDING_REGISTRY if building.is_buildable()]
+
+
+class SchematicLibrary:
+    """Every distinct schematic shape of some buildings, and the (building, rotation) pairs that have it.
+
+    Rotated schematics are frozen grids, which hash by content, so identical shapes are found with a dict.
+    """
+
+    def __init__(self, buildings: Iterable[Type[Building]]):
+        uses: dict[Grid, list[tuple[Type[Building], int]]] = {}
+        self.shapes: list[SchematicRotation] = []
+        for building in buildings:
+            for rotation_index in range(4):
+                rotation = building.get_rotation(rotation_index)
+                if rotation.grid not in uses:
+                    uses[rotation.grid] = []
+                    self.shapes.append(rotation)
+                uses[rotation.grid].append((building, rotation_index))
+        # The (building, rotation) pairs of each shape in shapes.
+        self.uses: list[tuple[tuple[Type[Building], int], ...]] = [tuple(uses[shape.grid]) for shape in self.shapes]
+
+    def __len__(self) -> int:
+        return len(self.shapes)
+
+
+@cache
+def schematic_library(buildings: tuple[Type[Building], ...]) -> SchematicLibrary:
+    """Get the shared SchematicLibrary of buildings."""
+    return SchematicLibrary(buildings)
+
+
+def find_placements(grid: Grid, buildings: Iterable[Type[Building]] | None = None) -> list[Placement]:
+    """Get every valid (building, rotation, offset) placement on the grid."""
+    library = schematic_library(tuple(buildable_buildings() if buildings is None else buildings))
+    bitboard = Bitboard.from_grid(grid)
+    placements: list[Placement] = []
+    for shape, uses in zip(library.shapes, library.uses, strict=True):
+        offsets = bitboard.points(bitboard.match(shape))
+        placements.extend(Placement(building, rotation, offset) for building, rotation in uses for offset in offsets)
+    return placements
+
+
+class PlacementIndex:
+    """A live set of every valid placement on a bitboard.
+
+    Changing a cell can only create or destroy placements whose bounding box covers it, so after each change
+    to the bitboard call update(point) and only those windows are rechecked, once per distinct shape.
+    """
+
+    def __init__(self, bitboard: Bitboard, buildings: Iterable[Type[Building]] | None = None):
+        self.bitboard = bitboard
+        self.buildings = list(buildable_buildings() if buildings is None else buildings)
+        self.library = schematic_library(tuple(self.buildings))
+        # For each shape, the offsets at which it covers each cell, indexed by the cell's bit.
+        self._windows = [_window_masks(bitboard.width, bitboard.height, *shape.size) for shape in self.library.shapes]
+        # Mask of the valid offsets of each shape.
+        self._valid = [bitboard.match(shape) for shape in self.library.shapes]
+        self.placements: set[Placement] = {
+            Placement(building, rotation, offset)
+            for uses, valid in zip(self.library.uses, self._valid, strict=True)
+            for offset in bitboard.points(valid)
+            for building, rotation in uses
+        }
+
+    def __contains__(self, placement: object) -> bool:
+        return placement in self.placements
+
+    def __iter__(self) -> Iterator[Placement]:
+        return iter(self.placements)
+
+    def __len__(self) -> int:
+        return len(self.placements)
+
+    def update(self, point: GridPoint) -> None:
+        """Recheck every placement whose bounding box covers point."""
+        bitboard = self.bitboard
+        index = point.y * bitboard.width + point.x
+        for i, shape in enumerate(self.library.shapes):
+            window = self._windows[i][index]
+            old = self._valid[i]
+            new = (old & ~window) | bitboard.match(shape, within=window)
+            if new == old:
+                continue
+            self._valid[i] = new
+            uses = self.library.uses[i]
+            for offset in bitboard.points(new & ~old):
+                self.placements.update(Placement(building, rotation, offset) for building, rotation in uses)
+            for offset in bitboard.points(old & ~new):
+                self.placements.difference_update(Placement(building, rotation, offset) for building, rotation in uses)
+
+
+@cache
+def _window_masks(width: int, height: int, shape_width: int, shape_height: int) -> tuple[int, ...]:
+    """For each cell, the mask of the offsets at which a shape of the given size would cover it."""
+    masks = []
+    for y in range(height):
+        for x in range(width):
+            x_start, x_end = max(0, x - shape_width + 1), min(x, width - shape_width)
+            y_start, y_end = max(0, y - shape_height + 1), min(y, height - shape_height)
+            mask = 0
+            if x_start <= x_end:
+                row = ((1 << (x_end - x_start + 1)) - 1) << x_start
+                for row_y in range(y_start, y_end + 1):
+                    mask |= row << (row_y * width)
+            masks.append(mask)
+    return tuple(masks)
@@ -0,0 +1,44 @@
+"""Policies that choose moves for headless games.
+
+A policy is a function taking the current GameState and a random.Random and returning one of the
+state's legal moves. Register a policy in POLICIES to make it available by name to simulate.py, or
+refer to any other policy as "module:function".
+"""
+
+from __future__ import annotations
+
+import importlib
+import random
+from typing import Callable
+
+from tiny_space.engine import GameState, Move, PlaceResource
+
+Policy = Callable[[GameState, random.Random], Move]
+
+
+def random_policy(state: GameState, rng: random.Random) -> Move:
+    """Make any legal move."""
+    return rng.choice(state.legal_moves())
+
+
+def greedy_policy(state: GameState, rng: random.Random) -> Move:
+    """Build whenever possible, otherwise place the resource anywhere."""
+    if builds := state.legal_build_moves():
+        return rng.choice(builds)
+    return PlaceResource(rng.choice(tuple(state.legal_resource_moves())))
+
+
+POLICIES: dict[str, Policy] = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+}
+
+
+def get_policy(name: str) -> Policy:
+    """Get a policy from POLICIES, or import it from "module:function"."""
+    if name in POLICIES:
+        return POLICIES[name]
+    module_name, sep, function_name = name.partition(":")
+    if not sep:
+        raise ValueError(f"Unknown policy {name!r}, choose from {list(POLICIES)} or use module:function.")
+    return getattr(importlib.import_module(module_name), function_name)
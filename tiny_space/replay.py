@@ -0,0 +1,283 @@
+"""Compact binary replay logs.
+
+A replay log records the queue's seed and every move of a game, so the game can be replayed exactly. Numbers
+are stored as LEB128 varints, so a typical move takes 3 bytes. The layout is:
+
+    Header:  b"TSRP", version, grid width, grid height, seed, resources already taken from the queue
+    Place:   PLACE, x, y
+    Build:   BUILD, building index, rotation, offset x, offset y, location x, location y
+             The first time a building appears its index is the next unused one, followed by its name.
+    End:     END, red, blue, green, yellow, turns, grid digest
+
+Seeds are a tag (int or str) followed by the seed. Scores are zigzag encoded as they could be negative. The grid
+digest hashes the names of the tiles rather than their codes, as codes change whenever a Thing is added.
+
+Run this module with replay files to verify them, or with --render to watch them:
+    python -m tiny_space.replay game.tsr --render
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+from dataclasses import astuple
+from enum import IntEnum
+from pathlib import Path
+from typing import Iterator, Type
+
+from tiny_space.buildings import Building
+from tiny_space.engine import Build, GameState, Move, PlaceResource
+from tiny_space.grid import Grid
+from tiny_space.helpers import GridPoint, Point
+from tiny_space.matching import Placement
+from tiny_space.resources import ResourceQueue
+from tiny_space.thing import TILE_REGISTRY
+
+MAGIC = b"TSRP"
+VERSION = 1
+
+
+class Record(IntEnum):
+    END = 0
+    PLACE = 1
+    BUILD = 2
+
+
+class SeedType(IntEnum):
+    INT = 1
+    STR = 2
+
+
+class ReplayError(Exception):
+    """The replay is malformed or didn't reproduce the recorded result."""
+
+
+def write_varint(out: bytearray, value: int) -> None:
+    """Append an unsigned LEB128 varint."""
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def grid_digest(grid: Grid) -> int:
+    """A hash of the grid that stays the same when tile codes change."""
+    names = ",".join(repr(TILE_REGISTRY[code]) for code in grid.codes)
+    return int.from_bytes(hashlib.blake2b(names.encode(), digest_size=8).digest(), "little")
+
+
+def zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value: int) -> int:
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+
+class ReplayLog:
+    """Records the moves made in a GameState. Attach it with GameState.start_recording()."""
+
+    def __init__(self, state: GameState):
+        self.data = bytearray(MAGIC)
+        self._building_indices: dict[Type[Building], int] = {}
+        # Length of the log and number of buildings named before each move, so moves can be undone.
+        self._marks: list[tuple[int, int]] = []
+        self.finished = False
+        write_varint(self.data, VERSION)
+        write_varint(self.data, state.grid.width)
+        write_varint(self.data, state.grid.height)
+        seed = state.queue.seed
+        if isinstance(seed, int):
+            write_varint(self.data, SeedType.INT)
+            write_varint(self.data, zigzag(seed))
+        else:
+            encoded = str(seed).encode()
+            write_varint(self.data, SeedType.STR)
+            write_varint(self.data, len(encoded))
+            self.data.extend(encoded)
+        write_varint(self.data, state.queue.taken)
+
+    def place(self, point: GridPoint) -> None:
+        self._marks.append((len(self.data), len(self._building_indices)))
+        for value in (Record.PLACE, point.x, point.y):
+            write_varint(self.data, value)
+
+    def build(self, placement: Placement, location: GridPoint) -> None:
+        self._marks.append((len(self.data), len(self._building_indices)))
+        write_varint(self.data, Record.BUILD)
+        if (index := self._building_indices.get(placement.building)) is None:
+            index = self._building_indices[placement.building] = len(self._building_indices)
+            write_varint(self.data, index)
+            name = repr(placement.building).encode()
+            write_varint(self.data, len(name))
+            self.data.extend(name)
+        else:
+            write_varint(self.data, index)
+        for value in (placement.rotation, *placement.offset, *location):
+            write_varint(self.data, value)
+
+    def undo(self) -> None:
+        """Remove the last move from the log."""
+        if not self._marks:
+            raise ReplayError("Can't undo a move made before recording started.")
+        length, buildings = self._marks.pop()
+        # This also removes the result, if the game had finished.
+        del self.data[length:]
+        self.finished = False
+        for building, index in list(self._building_indices.items()):
+            if index >= buildings:
+                del self._building_indices[building]
+
+    def finish(self, state: GameState) -> bytes:
+        """Record the final result of the game, to be checked on replay, and get the log."""
+        if not self.finished:
+            write_varint(self.data, Record.END)
+            for value in astuple(state.score):
+                write_varint(self.data, zigzag(value))
+            write_varint(self.data, state.turn)
+            write_varint(self.data, grid_digest(state.grid))
+            self.finished = True
+        return bytes(self.data)
+
+
+class ReplayReader:
+    """Reads a replay log, yielding its moves."""
+
+    def __init__(self, data: bytes):
+        if data[: len(MAGIC)] != MAGIC:
+            raise ReplayError("Not a Tiny Space replay.")
+        self.data = data
+        self.position = len(MAGIC)
+        if (version := self.read_varint()) != VERSION:
+            raise ReplayError(f"Unsupported replay version {version}.")
+        self.grid_size = GridPoint(self.read_varint(), self.read_varint())
+        seed_type = self.read_varint()
+        self.seed: int | str = unzigzag(self.read_varint()) if seed_type == SeedType.INT else self.read_str()
+        self.skip = self.read_varint()
+        self.buildings: list[Type[Building]] = []
+        # Filled in once the moves have been read.
+        self.final_score: tuple[int, ...] | None = None
+        self.final_turn: int | None = None
+        self.final_digest: int | None = None
+
+    def read_varint(self) -> int:
+        value = shift = 0
+        while True:
+            try:
+                byte = self.data[self.position]
+            except IndexError:
+                raise ReplayError("Replay ended unexpectedly.") from None
+            self.position += 1
+            value |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return value
+            shift += 7
+
+    def read_str(self) -> str:
+        length = self.read_varint()
+        text = self.data[self.position : self.position + length].decode()
+        self.position += length
+        return text
+
+    def read_building(self) -> Type[Building]:
+        index = self.read_varint()
+        if index == len(self.buildings):
+            name = self.read_str()
+            buildings = {repr(building): building for building in Building.BUILDING_REGISTRY}
+            if name not in buildings:
+                raise ReplayError(f"Unknown building {name!r}.")
+            self.buildings.append(buildings[name])
+        return self.buildings[index]
+
+    def __iter__(self) -> Iterator[Move]:
+        while self.position < len(self.data):
+            match self.read_varint():
+                case Record.END:
+                    self.final_score = tuple(unzigzag(self.read_varint()) for _ in range(4))
+                    self.final_turn = self.read_varint()
+                    self.final_digest = self.read_varint()
+                    return
+                case Record.PLACE:
+                    yield PlaceResource(GridPoint(self.read_varint(), self.read_varint()))
+                case Record.BUILD:
+                    building = self.read_building()
+                    rotation = self.read_varint()
+                    offset = GridPoint(self.read_varint(), self.read_varint())
+                    location = GridPoint(self.read_varint(), self.read_varint())
+                    yield Build(Placement(building, rotation, offset), location)
+                case record:
+                    raise ReplayError(f"Unknown record type {record}.")
+
+    def new_game(self) -> GameState:
+        """Make a GameState in the position the replay starts from."""
+        queue = ResourceQueue(self.seed)
+        queue.take_n(self.skip)
+        return GameState(self.grid_size, queue=queue)
+
+    def verify(self, state: GameState) -> None:
+        """Check the state matches the result recorded at the end of the replay."""
+        if self.final_digest is None:
+            raise ReplayError("Replay has no recorded result.")
+        if astuple(state.score) != self.final_score:
+            raise ReplayError(f"Score {astuple(state.score)} doesn't match recorded {self.final_score}.")
+        if state.turn != self.final_turn:
+            raise ReplayError(f"Turn {state.turn} doesn't match recorded {self.final_turn}.")
+        if grid_digest(state.grid) != self.final_digest:
+            raise ReplayError("Final grid doesn't match the recorded grid.")
+
+
+def replay(data: bytes) -> GameState:
+    """Replay a game as fast as possible, verifying it ends as recorded."""
+    reader = ReplayReader(data)
+    state = reader.new_game()
+    for move in reader:
+        if not state.apply(move):
+            raise ReplayError(f"Illegal move in replay: {move}")
+    reader.verify(state)
+    return state
+
+
+def render_replay(data: bytes, moves_per_second: float = 4) -> GameState:
+    """Replay a game in a window, drawing it with World."""
+    import pygame as pg
+
+    from tiny_space.world import World
+
+    reader = ReplayReader(data)
+    state = reader.new_game()
+    pg.init()
+    pg.display.set_caption("Tiny Space replay")
+    screen = pg.display.set_mode((640, 640))
+    world = World(Point(*screen.get_size()), state=state)
+    clock = pg.time.Clock()
+    for move in reader:
+        if not state.apply(move):
+            raise ReplayError(f"Illegal move in replay: {move}")
+        if any(event.type == pg.QUIT for event in pg.event.get()):
+            break
+        screen.fill((0, 0, 0))
+        screen.blit(world.render(Point(-1, -1)), (0, 0))
+        pg.display.update()
+        clock.tick(moves_per_second)
+    else:
+        reader.verify(state)
+    pg.quit()
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay and verify Tiny Space replay files.")
+    parser.add_argument("files", type=Path, nargs="+")
+    parser.add_argument("--render", action="store_true", help="Watch the replays.")
+    parser.add_argument("--speed", type=float, default=4, help="Moves per second when rendering.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    for file in args.files:
+        data = file.read_bytes()
+        state = render_replay(data, args.speed) if args.render else replay(data)
+        logging.info(f"{file}: verified {state.turn} turns, score {astuple(state.score)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,9 @@ Resources are used in the construction of Buildings.
 from __future__ import annotations
 
 import random
-from typing import Type
+from collections import deque
+from itertools import islice
+from typing import Any, Iterator, NamedTuple, Type
 
 from tiny_space.thing import Thing
 
@@ -38,46 +40,109 @@ class Aerofoam(Resource):
     pass
 
 
+class QueueState(NamedTuple):
+    """Everything needed to restore a ResourceQueue to an earlier point."""
+
+    queue: tuple[Type[Resource], ...]
+    rng_state: Any
+    last_resource_taken: Type[Resource] | None
+    taken: int
+
+
 class ResourceQueue:
-    """Manages an eternal queue of semi-random resources."""
-
-    def __init__(self, seed: str | None = None):
-        # Comment this out for actual random.
-        if seed is not None:
-            random.seed(seed)
-        self.queue: list[Type[Resource]] = []
-        self.extend_queue()
-        self.last_resource_taken: Type[Resource]
-
-    def extend_queue(self):
-        """Repopulates the queue with an even balance of resources."""
-        pool = [resource for resource in Resource.RESOURCE_REGISTRY for _ in range(5)]
-        random.shuffle(pool)
-        self.queue.extend(pool)
+    """Manages an eternal queue of semi-random resources.
+
+    Resources come in shuffled 'bags' containing an even balance of every resource. Bags are only generated
+    when something looks or takes that far ahead, and resources are held in a deque so taking is O(1).
+
+    Each queue shuffles with its own random.Random, so queues with the same seed always give the same
+    resources no matter what else uses random. A seed of None picks a random seed, which is still stored in
+    seed so the queue can be recreated.
+    """
+
+    def __init__(self, seed: str | int | None = None):
+        self.seed = random.SystemRandom().getrandbits(64) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.queue: deque[Type[Resource]] = deque()
+        self._bags = self.generate_bags()
+        self.last_resource_taken: Type[Resource] | None = None
+        # Number of resources taken since the queue was created.
+        self.taken = 0
+
+    def getstate(self) -> QueueState:
+        """Get the queue's state, to be restored with setstate."""
+        return QueueState(tuple(self.queue), self.rng.getstate(), self.last_resource_taken, self.taken)
+
+    def setstate(self, state: QueueState) -> None:
+        """Restore the queue to a state from getstate."""
+        self.queue = deque(state.queue)
+        self.rng.setstate(state.rng_state)
+        self.last_resource_taken = state.last_resource_taken
+        self.taken = state.taken
+
+    def new_bag(self) -> list[Type[Resource]]:
+        """Make a shuffled bag with an even balance of resources."""
+        bag = [resource for resource in Resource.RESOURCE_REGISTRY for _ in range(5)]
+        self.rng.shuffle(bag)
+        return bag
+
+    def generate_bags(self) -> Iterator[list[Type[Resource]]]:
+        while True:
+            yield self.new_bag()
+
+    def extend_queue(self, n: int = 1):
+        """Make sure there are at least n resources in the queue."""
+        while len(self.queue) < n:
+            self.queue.extend(next(self._bags))
+
+    def peek_at(self, index: int) -> Type[Resource]:
+        """Peek at the resource index places ahead, without copying the queue"""
+        self.extend_queue(index + 1)
+        return self.queue[index]
+
+    def lookahead(self) -> Iterator[Type[Resource]]:
+        """Iterate through the upcoming resources for as far as needed, without taking them.
+
+        Each resource costs O(1), as the queue is iterated directly rather than indexed. Don't use the queue
+        while iterating.
+        """
+        yield from self.queue
+        while True:
+            bag = next(self._bags)
+            self.queue.extend(bag)
+            yield from bag
 
     def peek_n(self, n) -> list[Type[Resource]]:
         """Peek, but don't remove the next n items from the queue"""
-        while len(self.queue) < n:
-            self.extend_queue()
-        return self.queue[:n]
+        self.extend_queue(n)
+        return list(islice(self.queue, n))
 
     def peek(self):
         """Peek, but don't remove the next item from the queue"""
-        return self.peek_n(1)[0]
+        return self.peek_at(0)
 
     def take_n(self, n: int) -> list[Type[Resource]]:
         """Take the next n resources from the queue"""
-        try:
-            return self.peek_n(n)
-        finally:
-            self.last_resource_taken = self.queue[n - 1]
-            self.queue = self.queue[n:]
+        return [self.take() for _ in range(n)]
 
     def take(self):
         """Take the next item from the queue"""
-        return self.take_n(1)[0]
+        self.extend_queue(1)
+        self.last_resource_taken = self.queue.popleft()
+        self.taken += 1
+        return self.last_resource_taken
+
+    def untake(self, resource: Type[Resource], last_resource_taken: Type[Resource] | None) -> None:
+        """Put a taken resource back on the front of the queue, undoing take.
+
+        last_resource_taken is what it was before the resource was taken.
+        """
+        self.queue.appendleft(resource)
+        self.last_resource_taken = last_resource_taken
+        self.taken -= 1
 
 
+# Use ResourceQueue() for actual random.
 Queue = ResourceQueue("debug")
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+"""Incremental scoring.
+
+The score is the sum of every tile's own score plus the adjacency rules of every building, which score for
+each orthogonally adjacent tile of a given kind. Rather than adding up the whole board after each move,
+ScoreTracker keeps running totals and applies the change in score of each tile change, which only depends on
+the tile and its neighbours.
+"""
+
+from __future__ import annotations
+
+from functools import cache
+
+from tiny_space.grid import Grid, neighbour_indices
+from tiny_space.helpers import GridPoint
+from tiny_space.score import Score
+from tiny_space.thing import TILE_REGISTRY, Tile
+
+Scores = tuple[int, int, int, int]
+
+
+@cache
+def rule_score(tile: Tile, neighbour: Tile) -> Scores:
+    """Score tile earns from having neighbour orthogonally adjacent."""
+    total = [0, 0, 0, 0]
+    for rule in getattr(tile, "adjacency_rules", ()):
+        if issubclass(neighbour, rule.neighbour):
+            total = [a + b for a, b in zip(total, rule.score, strict=True)]
+    return tuple(total)
+
+
+@cache
+def pair_score(tile: Tile, neighbour: Tile) -> Scores:
+    """Score earned by both tiles of an adjacent pair from each other."""
+    forward, backward = rule_score(tile, neighbour), rule_score(neighbour, tile)
+    return tuple(a + b for a, b in zip(forward, backward, strict=True))  # type: ignore[return-value]
+
+
+class ScoreTracker:
+    """Keeps a Score up to date with a grid as its tiles change.
+
+    Call update(point, old) after every change to the grid, with the tile that used to be at point.
+    """
+
+    def __init__(self, grid: Grid, score: Score):
+        self.grid = grid
+        self.score = score
+        self._neighbours = neighbour_indices(grid.width, grid.height)
+        self.totals = self.calculate()
+        self.score.set_scores(*self.totals)
+
+    def calculate(self) -> list[int]:
+        """Add up the score of the whole grid from scratch."""
+        totals = [0, 0, 0, 0]
+        codes = self.grid.codes
+        for index, code in enumerate(codes):
+            tile = TILE_REGISTRY[code]
+            totals = [a + b for a, b in zip(totals, tile.score, strict=True)]
+            for n in self._neighbours[index]:
+                totals = [a + b for a, b in zip(totals, rule_score(tile, TILE_REGISTRY[codes[n]]), strict=True)]
+        return totals
+
+    def update(self, point: GridPoint, old: Tile) -> None:
+        """Apply the change in score from the tile at point having been old."""
+        codes = self.grid.codes
+        new = TILE_REGISTRY[codes[point.y * self.grid.width + point.x]]
+        if new is old:
+            return
+        delta = [a - b for a, b in zip(new.score, old.score, strict=True)]
+        for n in self._neighbours[point.y * self.grid.width + point.x]:
+            neighbour = TILE_REGISTRY[codes[n]]
+            gained, lost = pair_score(new, neighbour), pair_score(old, neighbour)
+            delta = [d + g - l for d, g, l in zip(delta, gained, lost, strict=True)]
+        if any(delta):
+            self.totals = [a + b for a, b in zip(self.totals, delta, strict=True)]
+            self.score.set_scores(*self.totals)
@@ -5,16 +5,17 @@ The sidebar contains the players score, resource queue, and the schematic librar
 
 import importlib.resources
 import random
-from dataclasses import fields
-from typing import Type
+from dataclasses import astuple, fields
+from typing import Hashable, Type
 
 import pygame as pg
 
 import config
 from tiny_space import resources
+from tiny_space.asset_manager import assets
 from tiny_space.buildings import Building
 from tiny_space.cursor import CursorStates, cursor
-from tiny_space.helpers import Event, Observer, Point
+from tiny_space.helpers import Event, Point, events
 from tiny_space.score import score
 from tiny_space.templates import GraphicsComponent
 from tiny_space.world import Color, WorldGraphicsComponent
@@ -25,22 +26,38 @@ ROOT_ASSET_DIR = str(importlib.resources.files(__package__))
 class Scoreboard(GraphicsComponent):
     font_file = ROOT_ASSET_DIR + "/assets/Orbitron-Regular.ttf"
     font_size = 18 * config.SCALE
+    game_over_font_size = 9 * config.SCALE
 
     def __init__(self, dims: Point):
+        super().__init__()
         self.surface = pg.Surface(dims)
-        self.font = pg.font.Font(self.font_file, size=self.font_size)
+        self.game_over = False
+        events.subscribe(Event.GameOver, self.event_listener)
+        events.subscribe(Event.Undo, self.event_listener)
+
+    def event_listener(self, event: Event):
+        self.game_over = event == Event.GameOver
+
+    def render_state(self, mouse_position: Point) -> Hashable:
+        return astuple(score), self.game_over
 
     def render(self, **kwargs) -> pg.Surface:
         self.surface.fill((225, 207, 104))
         for i, s in enumerate(fields(score)):
             x = (self.surface.get_width() // 5) * (i + 1)
-            img = self.font.render(str(getattr(score, s.name)), True, (20, 20, 20))
+            img = assets.text(str(getattr(score, s.name)), self.font_file, self.font_size, (20, 20, 20))
             rect = img.get_rect(center=(x, self.surface.get_height() // 2))
             self.surface.blit(img, rect)
+        if self.game_over:
+            text = "Game over! Press R to restart."
+            img = assets.text(text, self.font_file, self.game_over_font_size, (20, 20, 20))
+            rect = img.get_rect(midbottom=(self.surface.get_width() // 2, self.surface.get_height() - config.SCALE))
+            self.surface.blit(img, rect)
         return self.surface
 
 
-class ResourceQueueUI(GraphicsComponent, Observer):
+class ResourceQueueUI(GraphicsComponent):
+    font_file = ROOT_ASSET_DIR + "/assets/Orbitron-Regular.ttf"
     distance_between_resources = 40 * config.SCALE
     resources_to_render = 5
     animation_duration = 250
@@ -51,16 +68,33 @@ class ResourceQueueUI(GraphicsComponent, Observer):
         self.resource_queue_head: Type[resources.Resource] = resources.Resource
         self.last_resource_placed_time: int = -100000
 
-        # Hacky animation variables.
-        random.seed()
+        # Hacky animation variables. Jitter has its own generator so it doesn't disturb anything else.
+        self.rng = random.Random()
         self.y_variation: list[int] = [
-            random.randrange(-6 * config.SCALE, 6 * config.SCALE) for _ in range(self.resources_to_render + 2)
+            self.rng.randrange(-6 * config.SCALE, 6 * config.SCALE) for _ in range(self.resources_to_render + 2)
         ]
         self.new_y_variation: None | list[int] = None
+        events.subscribe(Event.PlaceResource, self.event_listener)
+        events.subscribe(Event.Undo, self.event_listener)
+        # A copy, so the shared text isn't made transparent.
+        self.arrows = assets.text("< < <          " * 50, self.font_file, 9, (234, 236, 236), antialias=False).copy()
+        self.arrows.set_alpha(127)
 
     def event_listener(self, event: Event):
         if event == Event.PlaceResource:
             self.last_resource_placed_time = pg.time.get_ticks()
+        else:
+            # Stop sliding the undone resource off the queue, it's back at the front.
+            self.last_resource_placed_time = -100000
+            self.new_y_variation = None
+
+    def is_animating(self) -> bool:
+        return pg.time.get_ticks() - self.last_resource_placed_time < self.animation_duration
+
+    def render_state(self, mouse_position: Point) -> Hashable | None:
+        if self.is_animating():
+            return None
+        return tuple(resources.Queue.peek_n(self.resources_to_render))
 
     def render(self, **kwargs) -> pg.Surface:
         self.surface.fill((165 // 2, 169 // 2, 180 // 2))
@@ -72,26 +106,23 @@ class ResourceQueueUI(GraphicsComponent, Observer):
         time_delta = pg.time.get_ticks() - self.last_resource_placed_time
         animation_offset = 0
 
-        if time_delta < self.animation_duration:
-            resources_to_display.insert(0, resources.Queue.last_resource_taken)
+        last_resource_taken = resources.Queue.last_resource_taken
+        if time_delta < self.animation_duration and last_resource_taken is not None:
+            resources_to_display.insert(0, last_resource_taken)
             animation_offset = int(-self.distance_between_resources * (time_delta / self.animation_duration))
 
-        font_file = f"{ROOT_ASSET_DIR}/assets/Orbitron-Regular.ttf"
-        font = pg.Font(font_file, 9)
-        arrows = font.render("< < <          " * 50, False, (234, 236, 236))
-        arrows.set_alpha(127)
-        arrows_rect = arrows.get_rect(midleft=(-10 + animation_offset, rect.bottom // 3))
-        self.surface.blit(arrows, arrows_rect)
-        arrows_rect = arrows.get_rect(midleft=(-10 + animation_offset, rect.bottom * 2 // 3))
-        self.surface.blit(arrows, arrows_rect)
+        arrows = self.arrows
+        blits: list[tuple[pg.Surface, pg.Rect | tuple[int, int]]] = [
+            (arrows, arrows.get_rect(midleft=(-10 + animation_offset, rect.bottom // 3))),
+            (arrows, arrows.get_rect(midleft=(-10 + animation_offset, rect.bottom * 2 // 3))),
+        ]
 
         if animation_offset:
             if not self.new_y_variation:
-                random.seed()
                 self.new_y_variation = [
-                    random.randrange(-1 * config.SCALE, 1 * config.SCALE) + i for i in self.y_variation
+                    self.rng.randrange(-1 * config.SCALE, 1 * config.SCALE) + i for i in self.y_variation
                 ]
-                self.new_y_variation.append(random.randrange(-6 * config.SCALE, 6 * config.SCALE))
+                self.new_y_variation.append(self.rng.randrange(-6 * config.SCALE, 6 * config.SCALE))
 
             y_variation = [
                 int(
@@ -107,11 +138,12 @@ class ResourceQueueUI(GraphicsComponent, Observer):
             y_variation = self.y_variation
 
         for i, resource in enumerate(resources_to_display):
-            resource_surf = pg.transform.scale_by(resource.image(), config.SCALE)
+            resource_surf = resource.image(config.SCALE)
             x = 10 + animation_offset + (self.distance_between_resources * i)
             # Center Y
-            y = resource_surf.get_rect(center=self.surface.get_rect().center).top
-            self.surface.blit(resource_surf, (x, y + y_variation[i]))
+            y = rect.centery - resource_surf.get_height() // 2
+            blits.append((resource_surf, (x, y + y_variation[i])))
+        self.surface.fblits(blits)
         return self.surface
 
 
@@ -124,9 +156,13 @@ class SchematicEntry(GraphicsComponent):
     def __init__(self, dims: Point, building: type[Building]):
         self.surface = pg.Surface(dims)
         self.building = building
-        self.font = pg.font.Font(self.font_file, size=self.font_size)
-        self.desc_font = pg.font.Font(self.desc_font_file, size=self.desc_font_size)
         self.build_button_rect = pg.Rect()
+        # Made on the first render, once the space for the schematic is known.
+        self.schematic_renderer: WorldGraphicsComponent | None = None
+
+    def render_state(self, mouse_position: Point) -> Hashable:
+        # The build button is the only part that changes, when it's moused over.
+        return self.build_button_rect.collidepoint(mouse_position)
 
     def render(self, *, mouse_position: Point, **kwargs):
         self.surface.fill(Color.DARK_GREY)
@@ -135,7 +171,7 @@ class SchematicEntry(GraphicsComponent):
         sr = self.surface.get_rect()
 
         # Draw building name.
-        title = self.font.render(f"{self.building.get_name()}", True, pg.Color("black"))
+        title = assets.text(self.building.get_name(), self.font_file, self.font_size, "black")
         name_rect = title.get_rect(midtop=self.surface.get_rect().midtop)
         name_rect.y += gap_between_elements
         self.surface.blit(title, name_rect)
@@ -150,7 +186,7 @@ class SchematicEntry(GraphicsComponent):
         )
 
         # Draw building icon.
-        icon_surf = pg.transform.scale_by(self.building.image(), config.SCALE)
+        icon_surf = self.building.image(config.SCALE)
         icon_rect = icon_surf.get_rect(midleft=(description_rect.left + gap_between_elements, description_rect.centery))
         self.surface.blit(icon_surf, icon_rect)
 
@@ -166,7 +202,9 @@ class SchematicEntry(GraphicsComponent):
 
         # Draw building effect.
         desc_width = description_rect.right - icon_rect.right - (gap_between_elements * 3)
-        desc_text = self.desc_font.render(self.building.description, True, pg.Color("black"), wraplength=desc_width)
+        desc_text = assets.text(
+            self.building.description, self.desc_font_file, self.desc_font_size, "black", wraplength=desc_width
+        )
         desc_rect = desc_text.get_rect(midleft=(icon_rect.right + gap_between_elements * 2, description_rect.centery))
         self.surface.blit(desc_text, desc_rect)
 
@@ -181,14 +219,17 @@ class SchematicEntry(GraphicsComponent):
         color = mouseover_color if build_rect.collidepoint(mouse_position) else default_color
         pg.draw.rect(self.surface, color, build_rect, border_radius=10 * config.SCALE)
         pg.draw.rect(self.surface, border_color, build_rect, width=3 * config.SCALE, border_radius=10 * config.SCALE)
-        build_text = self.font.render("Build", True, pg.Color("black"))
+        build_text = assets.text("Build", self.font_file, self.font_size, "black")
         build_text_rect = build_text.get_rect(center=build_rect.center)
         self.surface.blit(build_text, build_text_rect)
 
         # Draw building schematic.
         space_to_fill = Point(sr.width, build_rect.top - description_rect.bottom)
-        schematic_renderer = WorldGraphicsComponent(space_to_fill, self.building.get_schematic().size, schematic=True)
-        surf = schematic_renderer.render(self.building.get_schematic(), background_color=Color.DARK_GREY)
+        if self.schematic_renderer is None:
+            self.schematic_renderer = WorldGraphicsComponent(
+                space_to_fill, self.building.get_schematic().size, schematic=True
+            )
+        surf = self.schematic_renderer.render(self.building.get_schematic(), background_color=Color.DARK_GREY)
         y = description_rect.bottom + ((build_rect.top - description_rect.bottom) // 2)
         rect = surf.get_rect(center=(sr.centerx, y))
         self.surface.blit(surf, rect)
@@ -217,7 +258,6 @@ class SchematicBook(GraphicsComponent):
             if b.is_buildable()
         }
         self.selected_building = list(self.building_entries.keys())[0]
-        self.font = pg.font.Font(self.font_file, size=self.font_size)
 
     def render_button(self, rect: pg.Rect, color: tuple[int, int, int] | None, text: str):
         """Render a single button from the button bar."""
@@ -228,7 +268,7 @@ class SchematicBook(GraphicsComponent):
         pg.draw.rect(self.surface, border_color, rect, width=2 * config.SCALE, border_radius=5 * config.SCALE)
 
         # Number
-        number = self.font.render(text, True, pg.Color("white"))
+        number = assets.text(text, self.font_file, self.font_size, "white")
         name_rect = number.get_rect(center=rect.center)
         self.surface.blit(number, name_rect)
 
@@ -246,6 +286,11 @@ class SchematicBook(GraphicsComponent):
                 color = None
             self.render_button(rect, color, str(i + 1))
 
+    def render_state(self, mouse_position: Point) -> Hashable:
+        building = self.get_moused_building(mouse_position) or self.selected_building
+        entry_state = self.building_entries[building].render_state(mouse_position - Point(0, self.button_bar_height))
+        return self.get_moused_building(mouse_position), self.selected_building, entry_state
+
     def render(self, *, mouse_position: Point, **kwargs):
         self.surface.fill(pg.Color("black"))
         self.render_button_bar(mouse_position)
@@ -286,14 +331,25 @@ class Sidebar(GraphicsComponent):
             (Point(0, scoreboard_height), ResourceQueueUI(Point(dims.x, resource_queue_height))),
             (Point(0, scoreboard_height + resource_queue_height), SchematicBook(Point(dims.x, schematic_book_height))),
         ]
+        # What each part looked like when it was last rendered.
+        self.render_states: list[Hashable | None] = [None] * len(self.surfaces)
+
+    def render_state(self, mouse_position: Point) -> Hashable | None:
+        states = tuple(surface.render_state(mouse_position - pos) for pos, surface in self.surfaces)
+        return None if None in states else states
 
     def render(self, mouse_position: Point, *args, **kwargs) -> pg.Surface:
-        self.surface.fill((255, 0, 0))
-        for _pos, surface in self.surfaces:
-            rendered = surface.render(mouse_position=mouse_position - _pos)
-            self.surface.blit(rendered, _pos)
+        """Render the parts that have changed. They cover the whole sidebar."""
+        for i, (pos, surface) in enumerate(self.surfaces):
+            state = surface.render_state(mouse_position - pos)
+            if state is None or state != self.render_states[i]:
+                self.surface.blit(surface.render(mouse_position=mouse_position - pos), pos)
+                self.render_states[i] = state
         return self.surface
 
+    def is_animating(self) -> bool:
+        return any(surface.is_animating() for _pos, surface in self.surfaces)
+
     def process_inputs(self, mouse_position: Point):
         self.process_inputs_subsurfaces(mouse_position, self.surfaces)
 
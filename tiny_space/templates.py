@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Callable, TypeVar, cast
+from typing import Any, Callable, Hashable, TypeVar, cast
 
 import pygame as pg
 
@@ -37,6 +37,17 @@ class GraphicsComponent(ABC):
     def render(self, *args, **kwargs) -> pg.Surface:
         raise NotImplementedError
 
+    def render_state(self, mouse_position: Point) -> Hashable | None:
+        """Everything that changes how the component looks, so it's only rendered when this changes.
+
+        The default of None means the component is rendered every frame.
+        """
+        return None
+
+    def is_animating(self) -> bool:
+        """Whether the component changes without any input, so needs rendering every frame."""
+        return False
+
     def update(self, time_delta: float) -> None:  # noqa: B027
         """Update game."""
         pass
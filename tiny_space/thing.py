@@ -2,42 +2,71 @@
 
 A thing occupies a board tile. Buildings and resources subclass from Thing.
 Thing classes are singletons.
+
+Every tile class is given a small integer code when it is defined, so grids can store
+tiles compactly. Look codes back up with TILE_REGISTRY[code].
 """
 
+from __future__ import annotations
+
 import importlib.resources
 import logging
 from functools import cache
 from pathlib import Path
 
-import pygame as pg
+# Maps integer tile codes back to their tile class. Nothing always has code 0.
+TILE_REGISTRY: list[Tile] = []
 
 
 # Sneaky way to get the
 class ThingMeta(type):
+    code: int
+
+    def __init__(cls, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if len(TILE_REGISTRY) > 255:
+            raise TypeError(f"Too many tile types to register {cls.__name__}")
+        cls.code = len(TILE_REGISTRY)
+        TILE_REGISTRY.append(cls)  # type: ignore[arg-type]
+
     def __repr__(self):
         return self.__name__
 
 
+class Nothing(metaclass=ThingMeta):
+    score = [0, 0, 0, 0]  # Four kinds of scores.
+
+    @classmethod
+    def image(cls, scale: float = 1):
+        return None
+
+
 class Thing(metaclass=ThingMeta):
     """Base class representing the contents of a board tile.
 
     Board tiles can only contain one 'Thing' at a time.
     Things are all singletons, so they can be compared using their classname.
-    Place the asset of a thing at "assets / cls.asset_subdir / class_name.png".
+    Place the asset of a thing at "assets / cls.asset_subdir / class_name.png", or set asset to use a different
+    file in asset_subdir.
     """
 
     root_asset_dir = Path(str(importlib.resources.files(__package__))) / "assets"
     asset_subdir: str = ""
+    asset: str | None = None
     score = [0, 0, 0, 0]  # Four kinds of scores.
 
     @classmethod
-    @cache
-    def image(cls):
-        return pg.image.load(cls.get_sprite_file())
+    def image(cls, scale: float = 1):
+        """Get the thing's image, scaled by scale. Images are shared, so don't draw on them."""
+        # Imported here so that the game rules can run without pygame.
+        from tiny_space.asset_manager import assets
+
+        return assets.image(cls.get_sprite_file(), scale)
 
     @classmethod
+    @cache
     def get_sprite_file(cls) -> Path:
-        file = cls.root_asset_dir / cls.asset_subdir / f"{cls}.png"
+        file = cls.root_asset_dir / cls.asset_subdir / (cls.asset or f"{cls}.png")
         if not file.exists():
             logging.critical(f"Could not find resource: {file!r}")
             file = cls.root_asset_dir / "error.png"
@@ -47,12 +76,4 @@ class Thing(metaclass=ThingMeta):
         return repr(self) == repr(obj)
 
 
-class Nothing:
-    score = [0, 0, 0, 0]  # Four kinds of scores.
-
-    @classmethod
-    def image(cls):
-        return None
-
-
 Tile = type[Thing] | type[Nothing]
@@ -6,21 +6,24 @@ from __future__ import annotations
 
 import importlib.resources
 import logging
+import time
 from enum import Enum
-from typing import Type
+from pathlib import Path
+from typing import Container, Hashable, Type
 
 import pygame as pg
 
 import config
-from tiny_space import buildings
-from tiny_space.buildings import Building
+from tiny_space.asset_manager import assets
 from tiny_space.cursor import CursorStates, cursor
+from tiny_space.engine import GameState, PlaceResource
 from tiny_space.grid import Grid
-from tiny_space.helpers import ORTHOGONAL, Event, GridPoint, Notifier, Point
-from tiny_space.resources import Queue, Resource
+from tiny_space.helpers import Event, GridPoint, Point, events
+from tiny_space.matching import Placement
+from tiny_space.resources import Queue
 from tiny_space.score import score
 from tiny_space.templates import GraphicsComponent
-from tiny_space.thing import Nothing, Thing
+from tiny_space.thing import TILE_REGISTRY, Nothing, Thing
 
 
 class Color(tuple, Enum):
@@ -37,6 +40,12 @@ class Color(tuple, Enum):
 class WorldGraphicsComponent(GraphicsComponent):
     """Handles the world surface and drawing to it."""
 
+    # Frames of the hammer animation drawn over a building's tiles while choosing where to put it.
+    hammer_files = [
+        Path(str(importlib.resources.files(__package__))) / f"assets/hammer/hammer{i}.png" for i in range(1, 6)
+    ]
+    hammer_frame_duration = 100
+
     def __init__(self, size: Point | int, grid_size: GridPoint, schematic: bool = False):
         """Size[Point] is the dimensions of the surface. Size[int] is the size of each grid tile."""
         if isinstance(size, int):
@@ -44,16 +53,19 @@ class WorldGraphicsComponent(GraphicsComponent):
         else:
             self.cell_size = self.calculate_cell_size(size, grid_size)
         self.surface = pg.Surface(grid_size * self.cell_size)
-
-        root_asset_dir = str(importlib.resources.files(__package__))
-        self.hammer_assets = [
-            pg.image.load(f"{root_asset_dir}/assets/hammer/hammer1.png"),
-            pg.image.load(f"{root_asset_dir}/assets/hammer/hammer2.png"),
-            pg.image.load(f"{root_asset_dir}/assets/hammer/hammer3.png"),
-            pg.image.load(f"{root_asset_dir}/assets/hammer/hammer4.png"),
-            pg.image.load(f"{root_asset_dir}/assets/hammer/hammer5.png"),
+        self.grid_width = grid_size.x
+        # Pixel coordinates of the centre of each cell, in row-major order.
+        half_cell = self.cell_size // 2
+        self.cell_centres = [
+            self.grid_to_pixels(GridPoint(x, y)) + Point(half_cell, half_cell)
+            for y in range(grid_size.y)
+            for x in range(grid_size.x)
         ]
-        self.frame_count = 0
+        # The grid and its tiles, redrawn only where the grid has changed since it was last drawn.
+        self.layer = pg.Surface(grid_size * self.cell_size)
+        self.layer_codes: bytes | None = None
+        self.layer_background: tuple | None = None
+
         # Schematic mode: disable interactivity for schematic book sidebar display.
         self.schematic = schematic
 
@@ -74,18 +86,31 @@ class WorldGraphicsComponent(GraphicsComponent):
     #     line_width = line_width * config.SCALE
     #     pg.draw.line(self.surface, color, start, end, line_width)
 
-    def draw_box(self, start: Point, size: Point | None = None, color=Color.BLUE, width=1):
+    def draw_box(self, start: Point, size: Point | None = None, color=Color.BLUE, width=1, surface=None):
         # If width is 0 then the box will be filled.
         size = size or Point(self.cell_size, self.cell_size)
-        pg.draw.rect(self.surface, color, (*start, *size), width=width * config.SCALE)
+        pg.draw.rect(surface or self.surface, color, (*start, *size), width=width * config.SCALE)
+
+    def centred_position(self, image: pg.Surface, grid_point: GridPoint) -> tuple[int, int]:
+        """Where to blit an image to centre it in a cell."""
+        x, y = self.cell_centres[grid_point.y * self.grid_width + grid_point.x]
+        return x - image.get_width() // 2, y - image.get_height() // 2
+
+    def cell_rect(self, grid_point: GridPoint) -> pg.Rect:
+        return pg.Rect(self.grid_to_pixels(grid_point), (self.cell_size, self.cell_size))
 
-    def draw_grid_surface(self, grid: Grid, skip_nothing: bool = False):
-        """Draw tile outlines. Use ignore_empty to draw outlines of full tiles."""
+    def draw_grid_surface(self, grid: Grid, skip_nothing: bool = False, area: pg.Rect | None = None):
+        """Draw tile outlines to the layer. Use ignore_empty to draw outlines of full tiles.
+
+        If area is given, only the outlines overlapping it are drawn.
+        """
         for pos, tile in grid:
             if skip_nothing and tile is Nothing:
                 continue
-            self.draw_box(self.grid_to_pixels(pos), color=Color.BLACK, width=0)
-            self.draw_box(self.grid_to_pixels(pos), color=Color.BLUE)
+            if area and not area.colliderect(self.cell_rect(pos)):
+                continue
+            self.draw_box(self.grid_to_pixels(pos), color=Color.BLACK, width=0, surface=self.layer)
+            self.draw_box(self.grid_to_pixels(pos), color=Color.BLUE, surface=self.layer)
 
     def get_moused_tile(self, mouse_coord: Point) -> GridPoint | None:
         if self.surface.get_rect().collidepoint(mouse_coord):
@@ -105,26 +130,29 @@ class WorldGraphicsComponent(GraphicsComponent):
                 continue
             self.draw_box(self.grid_to_pixels(location), color=color, width=width)
 
+    def hammer_frame(self) -> int | None:
+        """The frame of the hammer animation to draw, or None if there are no hammers."""
+        if self.schematic or not cursor.get_shadow_shape():
+            return None
+        # Timed rather than counted, as frames aren't drawn while nothing changes.
+        return (pg.time.get_ticks() // self.hammer_frame_duration) % len(self.hammer_files)
+
     def draw_build_hammers(self):
-        if shadow := cursor.get_shadow_shape():
+        if (frame := self.hammer_frame()) is not None:
+            shadow = cursor.get_shadow_shape()
             shadow_location = cursor.get_building_location()
-            if not shadow_location:
+            if not shadow or not shadow_location:
                 return
-            for pos, tile in shadow:
-                if tile is Nothing:
-                    continue
-                location = shadow_location + pos
-                scaled = pg.transform.scale_by(self.hammer_assets[(self.frame_count // 6) % 5], config.SCALE)
-                size = Point(*scaled.get_size())
-                self.surface.blit(
-                    scaled,
-                    (
-                        (location.x + 0.5) * self.cell_size - size.x // 2,
-                        (location.y + 0.5) * self.cell_size - size.y // 2,
-                    ),
-                )
-
-    def draw_cursor(self, grid: Grid, mouse_pos: Point):
+            hammer = assets.image(self.hammer_files[frame], config.SCALE)
+            self.surface.fblits(
+                [
+                    (hammer, self.centred_position(hammer, shadow_location + pos))
+                    for pos, tile in shadow
+                    if tile is not Nothing
+                ]
+            )
+
+    def draw_cursor(self, grid: Grid, mouse_pos: Point, placements: Container[Placement] = ()):
         # TODO: Make this method less ugly.
         if shadow := cursor.get_shadow_shape():
             shadow_location = cursor.get_building_location()
@@ -136,8 +164,8 @@ class WorldGraphicsComponent(GraphicsComponent):
             cursor_color = Color.CYAN
             if cursor.get_state() == CursorStates.BUILD_OUTLINE:
                 if grid.is_in_grid(moused_tile + cursor.get_shape().size - GridPoint(1, 1)):
-                    subgrid, _offset = grid.get_subgrid(*moused_tile, *cursor.get_shape().size)
-                    if validate_schematic(cursor.get_shape(), subgrid):
+                    building = cursor.get_building()
+                    if building and Placement(building, cursor.rotation, moused_tile) in placements:
                         cursor_color = Color.GREEN
                 else:
                     cursor_color = Color.RED
@@ -145,132 +173,170 @@ class WorldGraphicsComponent(GraphicsComponent):
                 cursor_color = Color.GREY
             self._draw_cursor(grid, moused_tile, cursor.get_shape(), cursor_color)
 
-    def draw_tile(self, thing: Type[Thing] | Type[Nothing], grid_coord: GridPoint):
-        if image := thing.image():
-            scaled = pg.transform.scale_by(image, config.SCALE)
-            asset_size = Point(*scaled.get_size())
-            self.surface.blit(
-                scaled,
-                (
-                    (grid_coord.x + 0.5) * self.cell_size - asset_size.x // 2,
-                    (grid_coord.y + 0.5) * self.cell_size - asset_size.y // 2,
-                ),
-            )
+    def tile_area(self, thing: Type[Thing] | Type[Nothing], grid_coord: GridPoint) -> pg.Rect:
+        """The area a tile covers: its cell, and its image where that's bigger than the cell."""
+        rect = self.cell_rect(grid_coord)
+        if scaled := thing.image(config.SCALE):
+            rect.union_ip(scaled.get_rect(topleft=self.centred_position(scaled, grid_coord)))
+        return rect
 
     def draw_tiles(self, grid: Grid):
-        for point, tile in grid:
-            self.draw_tile(tile, point)
-
-    def render(self, grid: Grid, mouse_pos: Point = Point(-1, -1), background_color=Color.BLUE) -> pg.Surface:
-        self.surface.fill(background_color)
-        self.draw_grid_surface(grid, skip_nothing=self.schematic)
-        if not self.schematic:
-            self.draw_cursor(grid, mouse_pos)
+        """Draw every tile to the layer. Anything outside the layer's clip area isn't drawn."""
+        blits = []
+        for (x, y), code in zip(self.cell_centres, grid.codes, strict=True):
+            if image := TILE_REGISTRY[code].image(config.SCALE):
+                blits.append((image, (x - image.get_width() // 2, y - image.get_height() // 2)))
+        self.layer.fblits(blits)
+
+    def update_layer(self, grid: Grid, background_color=Color.BLUE):
+        """Redraw the cells of the layer that have changed since it was last drawn."""
+        codes = grid.codes
+        if self.layer_codes is None or len(codes) != len(self.layer_codes) or background_color != self.layer_background:
+            area = self.layer.get_rect()
+        elif codes == self.layer_codes:
+            return
+        else:
+            areas = []
+            for i, (new, old) in enumerate(zip(codes, self.layer_codes, strict=True)):
+                if new != old:
+                    point = GridPoint(i % grid.width, i // grid.width)
+                    areas += [self.tile_area(TILE_REGISTRY[old], point), self.tile_area(grid[point], point)]
+            area = areas[0].unionall(areas[1:])
+        # Everything overlapping the area is redrawn in the usual order, so tiles bigger than their cells still
+        # overlap their neighbours the same way.
+        self.layer.set_clip(area)
+        self.layer.fill(background_color)
+        self.draw_grid_surface(grid, skip_nothing=self.schematic, area=area)
         self.draw_tiles(grid)
+        self.layer.set_clip(None)
+        self.layer_codes = codes.tobytes()
+        self.layer_background = background_color
+
+    def render(
+        self,
+        grid: Grid,
+        mouse_pos: Point = Point(-1, -1),
+        background_color=Color.BLUE,
+        placements: Container[Placement] = (),
+    ) -> pg.Surface:
+        """Draw the grid. placements are the buildings that can be built, to highlight under the cursor."""
+        self.update_layer(grid, background_color)
+        self.surface.blit(self.layer, (0, 0))
         if not self.schematic:
+            self.draw_cursor(grid, mouse_pos, placements)
             self.draw_build_hammers()
-        self.frame_count += 1
         return self.surface
 
 
-def validate_schematic(schematic: Grid, subgrid: Grid) -> bool:
-    return not any(
-        schematic_tile is not Nothing and schematic_tile != grid_tile
-        for (_, schematic_tile), (_, grid_tile) in zip(schematic, subgrid, strict=True)
-    )
-
-
 class World(GraphicsComponent):
-    default_grid_size = GridPoint(5, 7)
+    """Renders a GameState and turns clicks into moves using the global cursor."""
 
-    def __init__(self, size: Point, grid_size: GridPoint = default_grid_size):
-        self.grid = Grid.from_dimensions(grid_size)
-        self.grid[self.grid.size // 2] = buildings.Base
-        self.graphics = WorldGraphicsComponent(size, grid_size)
+    default_grid_size = GameState.default_grid_size
+
+    def __init__(self, size: Point, grid_size: GridPoint = default_grid_size, state: GameState | None = None):
+        # The sidebar displays the global queue and score, so play with those.
+        if state is None:
+            state = GameState(grid_size, queue=Queue, score=score)
+            state.start_recording()
+        self.state = state
+        self.replay_path = Path(config.REPLAY_DIR) / f"{time.strftime('%Y%m%d-%H%M%S')}.tsr"
+        self.graphics = WorldGraphicsComponent(size, self.state.grid.size)
 
     @property
     def surface(self):
         return self.graphics.surface
 
+    @property
+    def grid(self) -> Grid:
+        return self.state.grid
+
     def process_inputs(self, mouse_position: Point):
+        was_over = self.state.is_over
         moused_tile = self.graphics.pixels_to_grid(mouse_position)
         match cursor.get_state():
             case CursorStates.RESOURCE_PLACE:
-                resource = Queue.peek()
-                if self.fill_tile(moused_tile, resource):
-                    Queue.take()
-                    Notifier.notify(Event.PlaceResource)
+                if self.state.place_resource(moused_tile):
+                    events.post(Event.PlaceResource)
             case CursorStates.BUILD_OUTLINE:
                 self.lock_build_outline(moused_tile)
             case CursorStates.BUILD_LOCATION:
                 self.confirm_building(moused_tile)
+        if self.state.is_over and not was_over:
+            logging.info(f"Game over! Final score: {self.state.score}")
+            self.save_replay()
+            events.post(Event.GameOver)
+
+    def render_state(self, mouse_position: Point) -> Hashable:
+        # Points are made plain tuples, as they can't be compared with None.
+        moused_tile = self.graphics.get_moused_tile(mouse_position)
+        location = cursor.get_building_location()
+        return (
+            self.grid.zobrist,
+            moused_tile and tuple(moused_tile),
+            cursor.get_state(),
+            cursor.get_building(),
+            cursor.rotation,
+            location and tuple(location),
+            self.graphics.hammer_frame(),
+        )
+
+    def is_animating(self) -> bool:
+        return self.graphics.hammer_frame() is not None
 
     def render(self, mouse_pos: Point) -> pg.Surface:
         """Blit the grid to the center of the canvas."""
-        return self.graphics.render(self.grid, mouse_pos)
+        return self.graphics.render(self.grid, mouse_pos, placements=self.state.placements)
 
-    def has_adjacent_tile(self, grid_coord: GridPoint) -> bool:
-        """Returns True if an adjacent tile isn't empty."""
-        orthogonal_tiles: list[GridPoint] = [grid_coord + direction for direction in ORTHOGONAL]
-        return any(self.grid.is_in_grid(point) and self.grid[point] is not Nothing for point in orthogonal_tiles)
-
-    def fill_tile(self, point: GridPoint, thing: Type[Resource] | Type[Building]) -> bool:
-        """Fill the tile, if possible.
-
-        Filling a tile is not possible if it's already filled or if there are no adjacent filled tiles.
-        """
-        if self.grid[point] is not Nothing:
-            logging.warning(f"Illegal move: Can't fill occupied tile at {point}.")
-            return False
-        if not self.has_adjacent_tile(point):
-            logging.warning(f"Illegal move: Can't fill disconnected tile at {point}.")
-            return False
-        self.grid[point] = thing
-        return True
-
-    def calculate_score(self):
-        each_tiles_score = [tile.score for _pos, tile in self.grid]
-        new_scores = [sum(scores) for scores in zip(*each_tiles_score, strict=True)]
-        score.set_scores(*new_scores)
+    def buildable_placements(self) -> set[Placement]:
+        """Get every building, rotation and offset that could be built right now."""
+        return self.state.placements.placements
 
     def lock_build_outline(self, location: GridPoint):
         """Checks whether a building can be build with selected resources"""
-        schematic = cursor.get_shape()
-        if self.grid.is_in_grid(location + schematic.size - GridPoint(1, 1)):
-            subgrid, offset = self.grid.get_subgrid(location.x, location.y, schematic.size.x, schematic.size.y)
-            if validate_schematic(schematic, subgrid):
-                cursor.set_state(CursorStates.BUILD_LOCATION, location=offset)
-                return
-        else:
+        building = cursor.get_building()
+        assert building
+        if Placement(building, cursor.rotation, location) in self.state.placements:
+            cursor.set_state(CursorStates.BUILD_LOCATION, location=location)
+            return
+        if not self.grid.is_in_grid(location + cursor.get_shape().size - GridPoint(1, 1)):
             logging.warning("Illegal move: Build schematic does not fit in map")
         cursor.set_state(CursorStates.RESOURCE_PLACE)
         return
 
-    def remove_things_in_schematic(self):
-        schematic = cursor.get_shadow_shape()
-        assert schematic
-        offset = cursor.get_building_location()
-        assert offset
-        for pos, item in schematic:
-            if item is not Nothing:
-                self.grid[pos + offset] = Nothing
-
     def confirm_building(self, location: GridPoint):
-        schematic = cursor.get_shadow_shape()
-        assert schematic
+        building = cursor.get_building()
+        assert building
         offset = cursor.get_building_location()
         assert offset
-        # Maintain outline
-        valid_range = pg.Rect(
-            offset.x,
-            offset.y,
-            schematic.size.x,
-            schematic.size.y,
-        )
-        if valid_range.collidepoint(location) and schematic[location - offset] is not Nothing:
-            self.remove_things_in_schematic()
-            self.grid[location] = cursor.get_building() or Nothing
-            self.calculate_score()
-        else:
-            logging.warning("Invalid building placement, returning to resource placement.")
+        if self.state.build(Placement(building, cursor.rotation, offset), location):
+            events.post(Event.PlaceBuilding)
+        cursor.set_state(CursorStates.RESOURCE_PLACE)
+
+    def save_replay(self):
+        """Save the replay of this game, if it's being recorded and any moves have been made."""
+        if not self.state.log or not self.state.history:
+            return
+        try:
+            self.replay_path.parent.mkdir(parents=True, exist_ok=True)
+            self.replay_path.write_bytes(self.state.log.finish(self.state))
+        except OSError as e:
+            logging.warning(f"Couldn't save replay: {e}")
+            return
+        logging.info(f"Saved replay to {self.replay_path}")
+
+    def undo(self):
+        """Undo the last resource placed or building built."""
+        if self.state.undo():
+            cursor.set_state(CursorStates.RESOURCE_PLACE)
+            events.post(Event.Undo)
+
+    def redo(self):
+        """Redo the last move that was undone."""
+        move = self.state.redo()
+        if move is None:
+            return
+        events.post(Event.PlaceResource if isinstance(move, PlaceResource) else Event.PlaceBuilding)
         cursor.set_state(CursorStates.RESOURCE_PLACE)
+        if self.state.is_over:
+            self.save_replay()
+            events.post(Event.GameOver)